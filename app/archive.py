@@ -0,0 +1,112 @@
+import argparse
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, union_all
+from sqlalchemy.orm import Session, aliased
+
+from app import models
+from app.balances import checkpoint_through
+
+# Horizon d'archivage: les mouvements plus anciens quittent stock_movements
+MOVEMENT_ARCHIVE_DAYS = int(os.getenv("MOVEMENT_ARCHIVE_DAYS", "365"))
+# Lignes déplacées par transaction (verrous et undo log bornés)
+MOVEMENT_ARCHIVE_BATCH = int(os.getenv("MOVEMENT_ARCHIVE_BATCH", "1000"))
+
+_COLUMNS = ("id", "stock_id", "change_quantity", "note", "created_at")
+
+
+def movement_source(include_archived: bool = False):
+    """Entité à requêter pour les mouvements: table vive, ou vive + archive (UNION ALL).
+
+    La vue unifiée est un alias ORM de models.StockMovement: les routes et
+    `history_conditions` l'utilisent sans changement, les lignes archivées
+    sont sérialisées comme les autres.
+    """
+    if not include_archived:
+        return models.StockMovement
+    live = models.StockMovement.__table__
+    archive = models.StockMovementArchive.__table__
+    combined = union_all(
+        select(*[live.c[name] for name in _COLUMNS]),
+        select(*[archive.c[name] for name in _COLUMNS]),
+    ).subquery("all_stock_movements")
+    return aliased(models.StockMovement, combined)
+
+
+def archive_batch(db: Session, before: datetime, batch_size: int = MOVEMENT_ARCHIVE_BATCH) -> int:
+    """Déplace le prochain lot de mouvements antérieurs à `before` (une transaction).
+
+    Les lots suivent l'ordre des IDs. Un checkpoint de solde est d'abord posé
+    sur le dernier mouvement archivé de chaque stock, pour que le solde courant
+    n'ait jamais à lire l'archive. Renvoie le nombre de lignes déplacées.
+    """
+    Movement = models.StockMovement
+    rows = db.execute(
+        select(Movement.id, Movement.stock_id)
+        .where(Movement.created_at < before)
+        .order_by(Movement.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+    ids = [movement_id for movement_id, _ in rows]
+
+    checkpoint_through(db, {stock_id for _, stock_id in rows}, ids[-1])
+    live = Movement.__table__
+    db.execute(
+        insert(models.StockMovementArchive).from_select(
+            list(_COLUMNS),
+            select(*[live.c[name] for name in _COLUMNS]).where(live.c.id.in_(ids)),
+        )
+    )
+    db.execute(delete(Movement).where(Movement.id.in_(ids)))
+    db.commit()
+    return len(ids)
+
+
+def archive_movements(
+    db: Session,
+    before: Optional[datetime] = None,
+    batch_size: int = MOVEMENT_ARCHIVE_BATCH,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Archive par lots les mouvements antérieurs à `before` (défaut: horizon configuré).
+
+    Reprenable: chaque lot est validé séparément et l'état est la table vive
+    elle-même; un arrêt en cours de route perd au plus le lot en cours, qui
+    est annulé, et une nouvelle exécution repart là où la précédente s'est arrêtée.
+    """
+    if before is None:
+        before = datetime.now() - timedelta(days=MOVEMENT_ARCHIVE_DAYS)
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(db, before, batch_size)
+        if not count:
+            break
+        moved += count
+        batches += 1
+    return moved
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Archivage des mouvements de stock anciens")
+    parser.add_argument("--days", type=int, default=MOVEMENT_ARCHIVE_DAYS, help="Horizon en jours")
+    parser.add_argument("--batch-size", type=int, default=MOVEMENT_ARCHIVE_BATCH)
+    parser.add_argument("--max-batches", type=int, default=None, help="Arrêt après N lots (reprise au prochain lancement)")
+    args = parser.parse_args(argv)
+
+    from app.database import get_sessionmaker
+
+    before = datetime.now() - timedelta(days=args.days)
+    db = get_sessionmaker()()
+    try:
+        moved = archive_movements(db, before, args.batch_size, args.max_batches)
+    finally:
+        db.close()
+    print(f"{moved} mouvement(s) antérieur(s) au {before:%Y-%m-%d %H:%M} archivé(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Un checkpoint est posé tous les N mouvements d'un même stock: une requête
+# à date lit au plus N mouvements, quelle que soit la longueur de l'historique.
+CHECKPOINT_INTERVAL = int(os.getenv("BALANCE_CHECKPOINT_INTERVAL", "100"))
+
+
+def _last_checkpoints(stock_ids):
+    """Sous-requête: dernier checkpoint (par movement_id) de chaque stock"""
+    Checkpoint = models.StockBalanceCheckpoint
+    latest = (
+        select(Checkpoint.stock_id, func.max(Checkpoint.movement_id).label("movement_id"))
+        .where(Checkpoint.stock_id.in_(stock_ids))
+        .group_by(Checkpoint.stock_id)
+        .subquery()
+    )
+    return (
+        select(Checkpoint.stock_id, Checkpoint.movement_id, Checkpoint.balance)
+        .join(
+            latest,
+            (latest.c.stock_id == Checkpoint.stock_id) & (latest.c.movement_id == Checkpoint.movement_id),
+        )
+        .subquery()
+    )
+
+
+def _pending_balances(stock_ids, upper_id: Optional[int] = None):
+    """Requête: par stock, mouvements postérieurs au dernier checkpoint (nombre, dernier ID, solde cumulé)"""
+    Movement = models.StockMovement
+    last = _last_checkpoints(stock_ids)
+    conditions = [
+        Movement.stock_id.in_(stock_ids),
+        Movement.id > func.coalesce(last.c.movement_id, 0),
+    ]
+    if upper_id is not None:
+        conditions.append(Movement.id <= upper_id)
+    return (
+        select(
+            Movement.stock_id,
+            func.count(Movement.id).label("pending"),
+            func.max(Movement.id).label("last_movement_id"),
+            func.coalesce(func.max(last.c.balance), 0) + func.sum(Movement.change_quantity),
+        )
+        .outerjoin(last, last.c.stock_id == Movement.stock_id)
+        .where(*conditions)
+        .group_by(Movement.stock_id)
+    )
+
+
+def _insert_checkpoints(db: Session, pending) -> None:
+    if not pending:
+        return
+    Movement = models.StockMovement
+    last_ids = [row.last_movement_id for row in pending]
+    created = dict(
+        db.execute(select(Movement.id, Movement.created_at).where(Movement.id.in_(last_ids))).all()
+    )
+    db.add_all(
+        models.StockBalanceCheckpoint(
+            stock_id=stock_id,
+            movement_id=last_movement_id,
+            created_at=created[last_movement_id],
+            balance=balance,
+        )
+        for stock_id, _, last_movement_id, balance in pending
+    )
+    db.flush()
+
+
+def maintain_checkpoints(db: Session, stock_ids: Iterable[int]) -> None:
+    """Pose les checkpoints dus après écriture de mouvements (même transaction).
+
+    Une requête agrégée compte, par stock, les mouvements postérieurs au dernier
+    checkpoint; un nouveau checkpoint est inséré dès que CHECKPOINT_INTERVAL
+    est atteint. Les mouvements doivent déjà être flushés.
+    """
+    stock_ids = sorted(set(stock_ids))
+    if not stock_ids:
+        return
+    query = _pending_balances(stock_ids).having(func.count(models.StockMovement.id) >= CHECKPOINT_INTERVAL)
+    _insert_checkpoints(db, db.execute(query).all())
+
+
+def checkpoint_through(db: Session, stock_ids: Iterable[int], upper_id: int) -> None:
+    """Pose un checkpoint sur le dernier mouvement <= upper_id de chaque stock.
+
+    Appelé avant d'archiver ces mouvements: le solde courant ne lit jamais que
+    les mouvements postérieurs au dernier checkpoint, toujours en table vive.
+    """
+    stock_ids = sorted(set(stock_ids))
+    if not stock_ids:
+        return
+    _insert_checkpoints(db, db.execute(_pending_balances(stock_ids, upper_id)).all())
+
+
+def balance_at(db: Session, stock_id: int, at: Optional[datetime] = None) -> Optional[Decimal]:
+    """Solde d'un stock à la date `at`, ou actuel si `at` est None (None si le stock n'existe pas).
+
+    Lit le checkpoint le plus proche antérieur à `at` puis seulement les
+    mouvements qui le suivent. Suppose des mouvements en ajout seul, datés
+    par le serveur (created_at croissant avec l'ID).
+    """
+    if db.query(models.Stock.id).filter(models.Stock.id == stock_id).first() is None:
+        return None
+
+    Checkpoint = models.StockBalanceCheckpoint
+    checkpoint_query = select(Checkpoint.movement_id, Checkpoint.balance).where(
+        Checkpoint.stock_id == stock_id
+    )
+    if at is not None:
+        checkpoint_query = checkpoint_query.where(Checkpoint.created_at <= at)
+    checkpoint = db.execute(
+        checkpoint_query.order_by(Checkpoint.created_at.desc(), Checkpoint.movement_id.desc())
+        .limit(1)
+    ).first()
+
+    base_movement_id, base_balance = checkpoint if checkpoint is not None else (None, Decimal("0"))
+    # Au plus CHECKPOINT_INTERVAL mouvements via l'index (stock_id, id). Le solde
+    # courant ne lit que la table vive; à date, les mouvements suivant le
+    # checkpoint peuvent avoir été archivés depuis.
+    sources = [models.StockMovement]
+    if at is not None:
+        sources.append(models.StockMovementArchive)
+    delta = Decimal("0")
+    for Movement in sources:
+        conditions = [Movement.stock_id == stock_id]
+        if at is not None:
+            conditions.append(Movement.created_at <= at)
+        if base_movement_id is not None:
+            conditions.append(Movement.id > base_movement_id)
+        partial = db.execute(
+            select(func.coalesce(func.sum(Movement.change_quantity), 0)).where(*conditions)
+        ).scalar_one()
+        delta += Decimal(str(partial))
+    return Decimal(str(base_balance)) + delta
@@ -0,0 +1,59 @@
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+# Nombre maximal d'IDs acceptés par les suppressions en lot
+BULK_DELETE_MAX_IDS = 5000
+
+
+def blocked_detail(prefix: str, labels: Sequence[str]) -> str:
+    """Message 409 commun aux suppressions unitaires et en lot"""
+    return f"Suppression interdite: {prefix} possède " + " et ".join(labels)
+
+
+def bulk_delete(
+    db: Session,
+    model,
+    ids: Sequence[int],
+    blockers: Sequence[Tuple[object, str]],
+    blocked_prefix: str,
+    not_found_detail: str,
+    deleted_detail: str,
+) -> Tuple[List[dict], List[int]]:
+    """Supprime en lot les lignes de `model` sans dépendances; rapport par ID.
+
+    `blockers` liste les colonnes FK qui interdisent la suppression, avec leur
+    libellé de message. Une seule requête lit l'existence de chaque ID et ses
+    dépendances (un EXISTS par blocker), en verrouillant les lignes parentes:
+    aucune dépendance ne peut apparaître avant le DELETE. Les lignes éligibles
+    sont supprimées en une instruction. Statuts: 200 supprimé, 404 introuvable,
+    409 dépendances (mêmes messages que la suppression unitaire).
+
+    Renvoie (rapport dans l'ordre des IDs reçus, IDs supprimés).
+    """
+    ids = list(dict.fromkeys(ids))
+    checks = [exists().where(column == model.id).label(f"blocker_{i}") for i, (column, _) in enumerate(blockers)]
+    rows = db.execute(
+        select(model.id, *checks).where(model.id.in_(ids)).with_for_update()
+    ).all()
+    found = {row[0]: row[1:] for row in rows}
+
+    report = []
+    eligible = []
+    for row_id in ids:
+        flags = found.get(row_id)
+        if flags is None:
+            report.append({"id": row_id, "status_code": 404, "detail": not_found_detail})
+            continue
+        labels = [label for (_, label), blocked in zip(blockers, flags) if blocked]
+        if labels:
+            report.append({"id": row_id, "status_code": 409, "detail": blocked_detail(blocked_prefix, labels)})
+            continue
+        eligible.append(row_id)
+        report.append({"id": row_id, "status_code": 200, "detail": deleted_detail.format(id=row_id)})
+
+    if eligible:
+        db.execute(delete(model).where(model.id.in_(eligible)), execution_options={"synchronize_session": False})
+    db.commit()
+    return report, eligible
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.database import reads_replica
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Cache en mémoire (par worker), borné en taille, avec TTL optionnel.
+
+    Thread-safe: les routes sync s'exécutent dans le threadpool. Les compteurs
+    hits/misses servent à l'observabilité. Chaque worker a sa propre copie:
+    l'invalidation est locale, le TTL borne l'obsolescence entre workers.
+
+    `generation` augmente à chaque invalidation: une lecture en base commencée avant
+    (valeur passée à `set`) ne dépose pas un résultat que l'écriture a rendu périmé.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _cache_from_env(prefix: str, maxsize: int, ttl: float) -> LRUCache:
+    """Construit un cache dimensionné par `<PREFIX>_SIZE` / `<PREFIX>_TTL` (TTL 0 = sans expiration)"""
+    return LRUCache(
+        maxsize=int(os.getenv(f"{prefix}_SIZE", str(maxsize))),
+        ttl=float(os.getenv(f"{prefix}_TTL", str(ttl))) or None,
+    )
+
+
+# Inventaire agrégé par groupe (GET /groups/{id}/inventory), invalidé par les écritures de stocks
+group_inventory_cache = _cache_from_env("GROUP_INVENTORY_CACHE", 1024, 60)
+
+# Catalogue produits: fiches par ID et pages de GET /items/ (write-through depuis create/delete).
+# Données d'affichage seulement: une suppression sur un autre worker reste visible ici jusqu'au
+# TTL; les contrôles d'existence (FK) interrogent la base.
+item_cache = _cache_from_env("ITEM_CACHE", 4096, 60)
+item_page_cache = _cache_from_env("ITEM_PAGE_CACHE", 256, 300)
+
+# Registre pour l'observabilité (/internal/cache) et la remise à zéro (tests)
+CACHES = {
+    "group_inventory": group_inventory_cache,
+    "items": item_cache,
+    "item_pages": item_page_cache,
+}
+
+
+def clear_caches() -> None:
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def invalidate_group_inventory(group_ids: Iterable[Optional[int]]) -> None:
+    """Invalide l'inventaire des groupes touchés par une écriture (ignore les stocks sans groupe)"""
+    group_inventory_cache.invalidate(gid for gid in group_ids if gid is not None)
+
+
+def get_cached_item(db: Session, item_id: int) -> Optional[dict]:
+    """Fiche produit sérialisée, lue dans le cache puis en base (None si absent)"""
+    cached = item_cache.get(item_id)
+    if cached is not None:
+        return cached
+    item = db.query(models.Item).filter(models.Item.id == item_id).first()
+    if item is None:
+        return None
+    return cache_read_item(db, item)
+
+
+def cache_item(item: models.Item) -> dict:
+    """Write-through: enregistre la fiche d'un produit (création/lecture)"""
+    data = schemas.Item.model_validate(item).model_dump()
+    item_cache.set(item.id, data)
+    return data
+
+
+def cache_read_item(db, item: models.Item) -> dict:
+    """Fiche lue en base par `db`: mise en cache sauf si elle vient d'un réplica"""
+    if reads_replica(db):
+        return schemas.Item.model_validate(item).model_dump()
+    return cache_item(item)
+
+
+def invalidate_item(item_id: int) -> None:
+    """Invalide la fiche d'un produit et toutes les pages de liste"""
+    invalidate_items([item_id])
+
+
+def invalidate_items(item_ids: Iterable[int]) -> None:
+    """Invalide les fiches de plusieurs produits et toutes les pages de liste"""
+    item_cache.invalidate(item_ids)
+    item_page_cache.clear()
@@ -1,31 +1,308 @@
-import os
-from sqlalchemy import create_engine
+import itertools
+import math
+import threading
+import time
+from typing import List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.orm import declarative_base, sessionmaker
-from dotenv import load_dotenv
 
-# Charger les variables depuis le fichier .env
-load_dotenv()
+# .env chargé par app.settings; constantes réexportées pour les scripts et les tests existants
+from app.settings import (  # noqa: F401
+    ASYNC_DATABASE_URL,
+    DATABASE_URL,
+    DB_ASYNC,
+    DB_HOST,
+    DB_NAME,
+    DB_NAME_TEST,
+    DB_PASSWORD,
+    DB_PORT,
+    DB_USER,
+    TEST_DATABASE_URL,
+    Settings,
+    app_settings,
+    default_settings,
+)
+from app.slow_queries import install_slow_query_log
+
+
+def pool_options(settings: Optional[Settings] = None) -> dict:
+    """Options de pool communes aux engines sync et async"""
+    settings = settings or engine_settings()
+    return {
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.max_overflow,
+        "pool_recycle": settings.pool_recycle,
+        "pool_timeout": settings.pool_timeout,
+        "pool_pre_ping": settings.pool_pre_ping,
+    }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure l'attente des checkouts (temps passé à attendre une connexion libre)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        # Seuls les checkouts réussis comptent dans les moyennes d'attente
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+        return connection
+
+
+def pool_stats(target_engine) -> dict:
+    """Photo instantanée du pool d'un engine (compteurs de QueuePool si disponibles)"""
+    pool = target_engine.pool
+    stats = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update(
+                {
+                    "checkouts": pool.checkouts,
+                    "timeouts": pool.timeouts,
+                    "wait_time_total": round(pool.wait_time_total, 6),
+                    "wait_time_avg": round(pool.wait_time_total / pool.checkouts, 6) if pool.checkouts else 0.0,
+                    "wait_time_max": round(pool.wait_time_max, 6),
+                }
+            )
+    return stats
+
+
+# Engines et session factories créés à la demande (premier usage ou démarrage de
+# l'application), jamais à l'import: importer l'application ne charge pas le driver
+# MySQL et ne construit pas de pool, les tests qui remplacent `get_db` n'en paient rien.
+_settings: Optional[Settings] = None
+_engine = None
+_SessionLocal = None
+_read_engines: List = []
+_ReadSessionLocals: List = []
+_read_counter = itertools.count()
+_async_engine = None
+_AsyncSessionLocal = None
+_async_read_engines: List = []
+_AsyncReadSessionLocals: List = []
+_init_lock = threading.Lock()
+
+# Clé de Session.info posée sur les sessions des réplicas
+REPLICA_SESSION_INFO = "replica"
+
+
+def engine_settings() -> Settings:
+    """Configuration des engines du processus: celle de la dernière application démarrée, sinon l'environnement"""
+    return _settings or default_settings()
+
+
+def configure(settings: Settings) -> None:
+    """Fixe la configuration des engines; libère ceux créés avec une configuration précédente.
+
+    Les engines sont partagés par le processus; les drapeaux des routes restent propres à
+    chaque application (`app.state.settings`, voir app.settings.app_settings).
+    """
+    global _settings
+    if settings != engine_settings():
+        dispose_db()
+        _settings = settings
+
+
+def _create_engine(url: str):
+    # Pool configurable, pré-ping optionnel
+    target_engine = create_engine(url, poolclass=InstrumentedQueuePool, **pool_options())
+    # Journal des requêtes lentes (seuil SLOW_QUERY_MS, plan si SLOW_QUERY_EXPLAIN=1)
+    install_slow_query_log(target_engine)
+    return target_engine
+
+
+def init_db():
+    """Crée les engines (primaire, réplicas) et leurs session factories s'ils n'existent pas encore"""
+    global _engine, _SessionLocal
+    if _SessionLocal is None:
+        with _init_lock:
+            if _SessionLocal is None:
+                _read_engines[:] = [_create_engine(url) for url in engine_settings().database_read_urls]
+                _ReadSessionLocals[:] = [
+                    sessionmaker(autocommit=False, autoflush=False, bind=read_engine, info={REPLICA_SESSION_INFO: True})
+                    for read_engine in _read_engines
+                ]
+                _engine = _create_engine(engine_settings().database_url)
+                _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+    return _engine
+
+
+def get_engine():
+    return init_db()
+
+
+def get_sessionmaker():
+    init_db()
+    return _SessionLocal
+
+
+def read_engines() -> List:
+    """Engines des réplicas de lecture (vide sans DATABASE_READ_URLS)"""
+    init_db()
+    return list(_read_engines)
+
+
+def get_read_sessionmaker():
+    """Session factory de lecture: réplicas à tour de rôle, primaire s'il n'y en a pas"""
+    init_db()
+    readers = _ReadSessionLocals
+    if not readers:
+        return _SessionLocal
+    return readers[next(_read_counter) % len(readers)]
+
+
+def reads_replica(db) -> bool:
+    """La session lit sur un réplica, éventuellement en retard sur le primaire.
+
+    Ses lectures ne remplissent pas les caches partagés: une écriture vient peut-être
+    de les invalider, et le client qui l'a faite relirait l'ancienne valeur malgré
+    son cookie. Les caches se remplissent depuis le primaire (sync ou AsyncSession).
+    """
+    return bool(db.info.get(REPLICA_SESSION_INFO))
+
+
+def dispose_db() -> None:
+    """Ferme les pools (arrêt de l'application); le prochain usage recrée les engines"""
+    global _engine, _SessionLocal, _async_engine, _AsyncSessionLocal
+    with _init_lock:
+        for target_engine in [_engine, *_read_engines]:
+            if target_engine is not None:
+                target_engine.dispose()
+        _engine = _SessionLocal = None
+        _read_engines.clear()
+        _ReadSessionLocals.clear()
+    for target_engine in [_async_engine, *_async_read_engines]:
+        if target_engine is not None:
+            # AsyncEngine.dispose() est une coroutine; le pool sync sous-jacent se ferme sans boucle
+            target_engine.sync_engine.dispose()
+    _async_engine = _AsyncSessionLocal = None
+    _async_read_engines.clear()
+    _AsyncReadSessionLocals.clear()
+
+
+def __getattr__(name: str):
+    """Compatibilité: `from app.database import engine, SessionLocal` crée l'engine à ce moment-là"""
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Méthodes servies par un réplica; toute autre méthode écrit sur le primaire
+READ_METHODS = ("GET", "HEAD")
+# Cookie posé après une écriture: jusqu'à cette échéance (epoch), le client relit sur le primaire
+READ_YOUR_WRITES_COOKIE = "fridgey_read_primary_until"
+
+
+def _reads_primary(request: Request) -> bool:
+    """Le client a écrit récemment: le réplica peut ne pas encore avoir rejoué son écriture"""
+    deadline = request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    try:
+        return deadline is not None and float(deadline) > time.time()
+    except ValueError:
+        return False
+
+
+def get_db(request: Request, response: Response):
+    """Dépendance FastAPI partagée: ouvre/ferme une session DB par requête.
+
+    Avec DATABASE_READ_URLS, les GET lisent sur un réplica (à tour de rôle) et les
+    autres méthodes écrivent sur le primaire. Une écriture pose un cookie qui renvoie
+    les lectures du même client vers le primaire pendant READ_YOUR_WRITES_SECONDS.
+    """
+    init_db()
+    if not _ReadSessionLocals:
+        factory = _SessionLocal
+    elif request.method in READ_METHODS:
+        factory = _SessionLocal if _reads_primary(request) else get_read_sessionmaker()
+    else:
+        factory = _SessionLocal
+        window = app_settings(request).read_your_writes_seconds
+        if window > 0:
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE,
+                f"{time.time() + window:.3f}",
+                max_age=math.ceil(window),
+                httponly=True,
+                samesite="lax",
+            )
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
 
-# Récupération des infos depuis l'environnement
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_NAME = os.getenv("DB_NAME", "fridgey")
-DB_NAME_TEST = os.getenv("DB_NAME_TEST", f"{DB_NAME}_test")
+def get_async_sessionmaker():
+    """Crée à la demande les AsyncEngines (primaire, réplicas) et leurs session factories.
 
-# Construction de l’URL de connexion pour MariaDB/MySQL
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    Import différé: le driver async n'est requis que si le mode est activé.
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
-TEST_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME_TEST}"
+        def _create_async_engine(url: str):
+            # Pool explicite, comme en sync: certains dialectes (aiosqlite fichier) prennent NullPool
+            target_engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, **pool_options())
+            install_slow_query_log(target_engine.sync_engine)
+            return target_engine
 
+        settings = engine_settings()
+        _async_read_engines[:] = [_create_async_engine(url) for url in settings.async_database_read_urls]
+        _AsyncReadSessionLocals[:] = [
+            async_sessionmaker(
+                read_engine, autoflush=False, expire_on_commit=False, info={REPLICA_SESSION_INFO: True}
+            )
+            for read_engine in _async_read_engines
+        ]
+        _async_engine = _create_async_engine(settings.async_database_url)
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _AsyncSessionLocal
 
 
-# Création du moteur SQLAlchemy avec pré-ping pour robustesse des connexions
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+async def get_async_db(request: Request):
+    """Dépendance FastAPI: AsyncSession ouverte/fermée par requête.
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Avec ASYNC_DATABASE_READ_URLS, même routage que `get_db`: les GET lisent sur un
+    réplica à tour de rôle, sauf pendant la fenêtre du cookie posé par une écriture.
+    """
+    factory = get_async_sessionmaker()
+    if _AsyncReadSessionLocals and request.method in READ_METHODS and not _reads_primary(request):
+        factory = _AsyncReadSessionLocals[next(_read_counter) % len(_AsyncReadSessionLocals)]
+    async with factory() as db:
+        yield db
 
 # Base pour les modèles
 Base = declarative_base()
@@ -0,0 +1,48 @@
+import hashlib
+from typing import Optional, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy import select
+
+from app.pagination import PageParams, after_key
+
+
+def make_etag(*parts) -> str:
+    """ETag faible dérivé d'une empreinte (agrégats SQL, IDs...), sans sérialiser le corps."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Comparaison faible avec If-None-Match (liste d'ETags ou `*`)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or _opaque(etag) in {_opaque(c) for c in candidates}
+
+
+def conditional(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Pose l'ETag sur la réponse; renvoie un 304 vide si le client a déjà cette version."""
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+
+def page_versions(key_column, columns: Sequence, conditions: Sequence, page: PageParams):
+    """Lignes de version d'une page keyset: la clé et les colonnes que modifient les écritures.
+
+    Mêmes `limit + 1` lignes que la page servie (la sentinelle dit s'il y a une suite),
+    quelques colonnes sans ORM ni sérialisation: de quoi répondre 304 sans lire la page.
+    """
+    stmt = select(key_column, *columns).where(*conditions)
+    last_key = after_key(page)
+    if last_key is not None:
+        stmt = stmt.where(key_column > last_key)
+    return stmt.order_by(key_column).limit(page.limit + 1)
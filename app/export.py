@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+# Nombre de lignes lues par aller-retour sur le curseur serveur
+EXPORT_BATCH_SIZE = 1000
+
+ExportFormat = Literal["ndjson", "csv"]
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def iter_export(db: Session, stmt, fmt: ExportFormat) -> Iterator[str]:
+    """Itère sur les lignes de `stmt` via un curseur serveur et les encode par lot.
+
+    `yield_per` active `stream_results`: le driver ne matérialise jamais plus
+    de EXPORT_BATCH_SIZE lignes à la fois, la mémoire reste plate quelle que
+    soit la taille de la table. La session est fermée en fin d'itération,
+    la dépendance `get_db` ayant déjà rendu la main avant l'envoi du corps.
+    """
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        keys = list(result.keys())
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(keys)
+            for rows in result.partitions():
+                writer.writerows([_csv_value(v) for v in row] for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            # En-tête seul si aucune ligne
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(keys, row)), default=_json_default, ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
+
+
+def export_response(db: Session, stmt, fmt: ExportFormat, basename: str) -> StreamingResponse:
+    """Construit la réponse d'export streamée (NDJSON ou CSV)."""
+    return StreamingResponse(
+        iter_export(db, stmt, fmt),
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{basename}.{fmt}"'},
+    )
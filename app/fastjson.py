@@ -0,0 +1,68 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, List, Type
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import Table
+
+from app.settings import app_settings
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle: repli sur le module json standard
+    orjson = None
+
+
+def fast_json_enabled(request: Request) -> bool:
+    """Chemin rapide actif pour l'application (Settings.fast_json, FAST_JSON=1): listes sans validation pydantic"""
+    return app_settings(request).fast_json
+
+
+def _default(value: Any) -> Any:
+    """Types non natifs: Decimal -> float (comme les champs `float` des schémas)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """Réponse JSON encodée par orjson (datetime/date natifs, Decimal via `_default`)"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def schema_columns(schema: Type[BaseModel], table: Table) -> list:
+    """Colonnes de `table` correspondant aux champs du schéma, dans l'ordre du schéma"""
+    return [table.c[name] for name in schema.model_fields]
+
+
+def rows_to_dicts(rows: Iterable) -> List[dict]:
+    """Tuples de colonnes -> dicts (clés = noms de colonnes), sans passer par l'ORM"""
+    return [row._asdict() for row in rows]
+
+
+# En-têtes propres au corps, recalculés par la nouvelle réponse
+_BODY_HEADERS = (b"content-length", b"content-type")
+
+
+def fast_json_response(content: Any, response: Response) -> FastJSONResponse:
+    """Réponse orjson reprenant les en-têtes déjà posés sur `response` (curseur, ETag, cookies).
+
+    Copie des en-têtes bruts: les en-têtes répétés (plusieurs Set-Cookie) sont conservés.
+    """
+    fast = FastJSONResponse(content)
+    fast.raw_headers.extend((key, value) for key, value in response.raw_headers if key not in _BODY_HEADERS)
+    return fast
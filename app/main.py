@@ -1,36 +1,81 @@
-import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import IntegrityError
-from app.routers import users, groups, items, stocks, stock_movements
-
-app = FastAPI(title="Fridgey API")
-
-# CORS (origines autorisées via env CORS_ORIGINS="http://localhost:3000,https://app.example.com" ou "*")
-origins_env = os.getenv("CORS_ORIGINS", "*")
-if origins_env.strip() == "*":
-    allow_origins = ["*"]
-else:
-    allow_origins = [o.strip() for o in origins_env.split(",") if o.strip()]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allow_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Routes
-app.include_router(users.router, prefix="/users", tags=["Users"])
-app.include_router(groups.router, prefix="/groups", tags=["Groups"])
-app.include_router(items.router, prefix="/items", tags=["Items"])
-app.include_router(stocks.router, prefix="/stocks", tags=["Stocks"])
-app.include_router(stock_movements.router, prefix="/movements", tags=["Stock Movements"])
-
-
-@app.exception_handler(IntegrityError)
+from app import database
+from app.metrics import MetricsMiddleware, install_db_hooks
+from app.routers import users, groups, items, stocks, stock_movements, internal, metrics
+from app.pagination import NEXT_CURSOR_HEADER
+from app.settings import Settings
+from app.slow_queries import RequestContextMiddleware
+
+
+def _lifespan(settings: Settings):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Démarrage du worker: engine et session factory créés ici, pas à l'import.
+
+        Si `get_db` est remplacé (tests, bench), aucun engine n'est construit.
+        Arrêt: les pools sont fermés.
+        """
+        database.configure(settings)
+        if database.get_db not in app.dependency_overrides:
+            database.init_db()
+        try:
+            yield
+        finally:
+            database.dispose_db()
+
+    return lifespan
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """Construit l'application (uvicorn --factory app.main:create_app, ou `app` ci-dessous)"""
+    settings = settings or Settings()
+    app = FastAPI(title="Fridgey API", lifespan=_lifespan(settings))
+    app.state.settings = settings
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=list(settings.cors_origins),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Curseur de pagination et ETag lisibles par les clients navigateur
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
+    )
+
+    # Route émettrice des requêtes lentes, avec ou sans métriques
+    app.add_middleware(RequestContextMiddleware)
+
+    # Métriques Prometheus (GET /metrics): latence/statut par route, requêtes SQL par requête
+    if settings.metrics_enabled:
+        install_db_hooks()
+        app.add_middleware(MetricsMiddleware)
+
+    # Routes
+    if settings.db_async:
+        # Lectures en async def (AsyncSession); déclarées avant pour prendre la main sur les GET sync
+        from app.routers import async_reads
+
+        app.include_router(async_reads.router)
+    app.include_router(users.router, prefix="/users", tags=["Users"])
+    app.include_router(groups.router, prefix="/groups", tags=["Groups"])
+    app.include_router(items.router, prefix="/items", tags=["Items"])
+    app.include_router(stocks.router, prefix="/stocks", tags=["Stocks"])
+    app.include_router(stock_movements.router, prefix="/movements", tags=["Stock Movements"])
+    if settings.internal_endpoints:
+        app.include_router(internal.router, prefix="/internal", tags=["Internal"])
+    if settings.metrics_enabled:
+        app.include_router(metrics.router)
+
+    app.add_exception_handler(IntegrityError, sqlalchemy_integrity_error_handler)
+    return app
+
+
 async def sqlalchemy_integrity_error_handler(request: Request, exc: IntegrityError):
     """Transforme les erreurs d'intégrité SQL en réponses HTTP explicites.
 
@@ -64,3 +109,14 @@ async def sqlalchemy_integrity_error_handler(request: Request, exc: IntegrityErr
         message = "Violation d'intégrité des données"
 
     return JSONResponse(status_code=status, content={"detail": message, "sql_error_code": code})
+
+
+def __getattr__(name: str):
+    """Application par défaut (configuration de l'environnement): uvicorn app.main:app.
+
+    Construite au premier accès: `from app.main import create_app` n'en paie pas le coût.
+    """
+    if name == "app":
+        globals()["app"] = application = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,231 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Métriques par worker au format texte Prometheus (GET /metrics), sans dépendance:
+# un compteur ou un histogramme est un dict {labels -> valeurs} protégé par un verrou.
+# Activation: Settings.metrics_enabled (METRICS_ENABLED), lu par create_app.
+
+# Libellé des requêtes qui ne correspondent à aucune route (évite l'explosion des séries)
+UNMATCHED_ROUTE = "<unmatched>"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Compteur monotone par jeu de labels"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """Histogramme à bornes fixes (compteurs par tranche, cumulés au rendu)"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [compteurs par tranche (+Inf en dernier), somme]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, labels: Tuple = ()) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                extra = f'le="{le}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, labels, extra)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}"
+
+
+http_requests = Counter(
+    "fridgey_http_requests_total", "Requêtes HTTP traitées", ("method", "route", "status")
+)
+http_latency = Histogram(
+    "fridgey_http_request_duration_seconds", "Durée des requêtes HTTP", ("method", "route")
+)
+db_statements = Counter(
+    "fridgey_db_statements_total", "Requêtes SQL émises pendant les requêtes HTTP", ("method", "route")
+)
+db_time = Counter(
+    "fridgey_db_duration_seconds_total", "Temps passé dans le SGBD pendant les requêtes HTTP", ("method", "route")
+)
+db_statements_per_request = Histogram(
+    "fridgey_db_statements_per_request",
+    "Nombre de requêtes SQL par requête HTTP (détection des N+1)",
+    ("method", "route"),
+    buckets=STATEMENT_BUCKETS,
+)
+
+REGISTRY = (http_requests, http_latency, db_statements, db_time, db_statements_per_request)
+
+
+def render() -> str:
+    """Exposition au format texte Prometheus (version 0.0.4)"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    for metric in REGISTRY:
+        metric.reset()
+
+
+# -------- Statistiques SQL de la requête en cours --------
+
+class RequestStats:
+    """Compteurs SQL d'une requête HTTP, partagés avec le threadpool via le contexte"""
+
+    __slots__ = ("scope", "statements", "db_time")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.statements = 0
+        self.db_time = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("fridgey_request_stats", default=None)
+
+
+def current_request() -> Optional[RequestStats]:
+    """Statistiques de la requête HTTP en cours (None hors requête: jobs, scripts)"""
+    return _current_request.get()
+
+
+def route_label(scope: dict) -> str:
+    """Gabarit de la route résolue (`/stocks/{stock_id}`), pas le chemin brut"""
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE) if route is not None else UNMATCHED_ROUTE
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._fridgey_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += time.perf_counter() - context._fridgey_start
+
+
+def install_db_hooks() -> None:
+    """Écoute tous les engines (sync et async, tests compris) au niveau de la classe Engine"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: latence et statut par route, requêtes SQL et temps DB par requête.
+
+    ASGI pur (pas de BaseHTTPMiddleware): pas de tâche intermédiaire, corps en flux
+    inclus dans la mesure (exports).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            _current_request.reset(token)
+            method, route = scope["method"], route_label(scope)
+            http_requests.inc((method, route, str(status)))
+            http_latency.observe((method, route), duration)
+            db_statements.inc((method, route), stats.statements)
+            db_time.inc((method, route), stats.db_time)
+            db_statements_per_request.observe((method, route), stats.statements)
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, DECIMAL, TIMESTAMP, func
+import time
+
+from sqlalchemy import BigInteger, Column, Integer, String, Boolean, ForeignKey, Date, DECIMAL, TIMESTAMP, Index, func
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -35,6 +37,9 @@ class UserGroup(Base):
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
     group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
     role = Column(String(50))
+    # Horodatage (ns) de création: une appartenance change par suppression puis ajout,
+    # le max de cette colonne suit donc toute modification (ETag de /groups/{id}/users)
+    changed_at = Column(BigInteger, default=time.time_ns, server_default="0", nullable=False)
 
     user = relationship("User", back_populates="groups")
     group = relationship("Group", back_populates="users")
@@ -76,6 +81,29 @@ class Stock(Base):
         back_populates="stock",
         cascade="all, delete-orphan",
     )
+    checkpoints = relationship(
+        "StockBalanceCheckpoint",
+        back_populates="stock",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    archived_movements = relationship(
+        "StockMovementArchive",
+        back_populates="stock",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    # Index composites des filtres de list_stocks (déclarés ici pour SQLite aussi)
+    __table_args__ = (
+        Index("ix_stocks_user_item", "user_id", "item_id"),
+        Index("ix_stocks_group_item", "group_id", "item_id"),
+        Index("ix_stocks_item_expiration", "item_id", "expiration_date"),
+        # Écran "bientôt périmés" (/stocks/expiring): plage sur la date, par propriétaire
+        Index("ix_stocks_expiration", "expiration_date"),
+        Index("ix_stocks_user_expiration", "user_id", "expiration_date"),
+        Index("ix_stocks_group_expiration", "group_id", "expiration_date"),
+    )
 
 
 # STOCK_MOVEMENTS
@@ -89,3 +117,48 @@ class StockMovement(Base):
     created_at = Column(TIMESTAMP, server_default=func.now())
 
     stock = relationship("Stock", back_populates="movements")
+
+    # Historique d'un stock par plage de temps, ordre stable (created_at, id)
+    __table_args__ = (
+        Index("ix_stock_movements_stock_created", "stock_id", "created_at", "id"),
+        # Mouvements postérieurs à un checkpoint de solde (id > checkpoint.movement_id)
+        Index("ix_stock_movements_stock_id", "stock_id", "id"),
+    )
+
+
+# STOCK_MOVEMENTS_ARCHIVE (mouvements anciens déplacés par app/archive.py, mêmes IDs)
+class StockMovementArchive(Base):
+    __tablename__ = "stock_movements_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    stock_id = Column(Integer, ForeignKey("stocks.id", ondelete="CASCADE"), nullable=False)
+    change_quantity = Column(DECIMAL(10, 2))
+    note = Column(String(255))
+    created_at = Column(TIMESTAMP, nullable=False)
+    archived_at = Column(TIMESTAMP, server_default=func.now())
+
+    stock = relationship("Stock", back_populates="archived_movements")
+
+    # Mêmes chemins d'accès que stock_movements (historique, soldes à date)
+    __table_args__ = (
+        Index("ix_stock_movements_archive_stock_created", "stock_id", "created_at", "id"),
+        Index("ix_stock_movements_archive_stock_id", "stock_id", "id"),
+    )
+
+
+# STOCK_BALANCE_CHECKPOINTS (soldes cumulés périodiques pour les requêtes à date)
+class StockBalanceCheckpoint(Base):
+    __tablename__ = "stock_balance_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stock_id = Column(Integer, ForeignKey("stocks.id", ondelete="CASCADE"), nullable=False)
+    # Dernier mouvement inclus dans le solde, et sa date
+    movement_id = Column(Integer, nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False)
+    balance = Column(DECIMAL(12, 2), nullable=False)
+
+    stock = relationship("Stock", back_populates="checkpoints")
+
+    __table_args__ = (
+        Index("ix_stock_balance_checkpoints_stock_created", "stock_id", "created_at", "movement_id"),
+    )
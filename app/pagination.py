@@ -0,0 +1,106 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, Query, Response
+
+# Taille de page par défaut et plafond dur (au-delà -> 422)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# En-tête portant le curseur de la page suivante (absent sur la dernière page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode les valeurs de clé de la dernière ligne en curseur opaque (base64 url-safe)."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Décode un curseur opaque et vérifie qu'il porte `size` valeurs.
+
+    Lève une HTTPException 400 si le curseur est illisible.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    return values
+
+
+class PageParams:
+    """Paramètres de pagination communs (`?limit=&after=`)."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Taille de page"),
+        after: Optional[str] = Query(None, description="Curseur opaque renvoyé dans X-Next-Cursor"),
+    ):
+        self.limit = limit
+        self.after = after
+
+
+def after_key(page: PageParams) -> Optional[int]:
+    """Clé primaire portée par le curseur `after` (None en première page)."""
+    if page.after is None:
+        return None
+    (last_key,) = decode_cursor(page.after, 1)
+    if not isinstance(last_key, int) or isinstance(last_key, bool):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    return last_key
+
+
+def _trim_page(rows: list, key_column, page: PageParams, response: Response) -> list:
+    """Retire la ligne sentinelle et pose le curseur suivant si besoin."""
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(rows[-1], key_column.key))
+    return rows
+
+
+def paginate(query, key_column, page: PageParams, response: Response) -> list:
+    """Applique une pagination par clé primaire (keyset) à une requête ORM.
+
+    `WHERE key > :after ORDER BY key LIMIT :limit + 1`: le coût d'une page
+    reste constant quelle que soit sa profondeur (pas d'OFFSET). La ligne
+    supplémentaire sert uniquement à savoir s'il existe une page suivante;
+    le cas échéant son curseur est posé dans l'en-tête X-Next-Cursor.
+    """
+    last_key = after_key(page)
+    if last_key is not None:
+        query = query.filter(key_column > last_key)
+    rows = query.order_by(key_column).limit(page.limit + 1).all()
+    return _trim_page(rows, key_column, page, response)
+
+
+async def apaginate(db, stmt, key_column, page: PageParams, response: Response) -> list:
+    """Équivalent de `paginate` pour un `select()` exécuté sur une AsyncSession."""
+    last_key = after_key(page)
+    if last_key is not None:
+        stmt = stmt.where(key_column > last_key)
+    result = await db.execute(stmt.order_by(key_column).limit(page.limit + 1))
+    return _trim_page(list(result.scalars().all()), key_column, page, response)
+
+
+def paginate_rows(db, stmt, key_column, page: PageParams, response: Response) -> list:
+    """Équivalent de `paginate` pour un `select()` de colonnes: renvoie des `Row`, sans ORM."""
+    last_key = after_key(page)
+    if last_key is not None:
+        stmt = stmt.where(key_column > last_key)
+    rows = db.execute(stmt.order_by(key_column).limit(page.limit + 1)).all()
+    return _trim_page(rows, key_column, page, response)
+
+
+async def apaginate_rows(db, stmt, key_column, page: PageParams, response: Response) -> list:
+    """Équivalent de `paginate_rows` sur une AsyncSession."""
+    last_key = after_key(page)
+    if last_key is not None:
+        stmt = stmt.where(key_column > last_key)
+    result = await db.execute(stmt.order_by(key_column).limit(page.limit + 1))
+    return _trim_page(result.all(), key_column, page, response)
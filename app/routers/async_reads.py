@@ -0,0 +1,244 @@
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app import models, schemas
+from app.archive import movement_source
+from app.cache import cache_read_item, item_cache, item_page_cache
+from app.database import get_async_db
+from app.etag import conditional, make_etag
+from app.fastjson import fast_json_enabled, fast_json_response, rows_to_dicts, schema_columns
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams, apaginate, apaginate_rows
+from app.routers.stock_movements import history_conditions, history_page
+from app.routers.groups import group_users_etag, group_users_fingerprint
+from app.routers.items import cache_item_page, item_catalog_version, item_page_key, item_page_response
+from app.routers.stocks import (
+    set_stock_page_etag,
+    stock_etag,
+    stock_filters,
+    stock_page_not_modified,
+    stock_page_versions,
+)
+
+# Versions `async def` des routes de lecture, montées avant les routes sync
+# quand DB_ASYNC=1: l'attente MySQL libère la boucle au lieu d'occuper un
+# worker du threadpool. Les écritures restent servies par les routeurs sync.
+# Les identifiants utilisent le convertisseur `:int` pour ne pas masquer les
+# routes sync voisines (/stocks/export, /stocks/expiring, /movements/export).
+# Caches, ETags et chemin FAST_JSON sont ceux des routes sync (mêmes helpers).
+router = APIRouter()
+
+_load_groups = selectinload(models.User.groups).selectinload(models.UserGroup.group)
+
+
+async def _get_or_404(db: AsyncSession, stmt, detail: str):
+    obj = (await db.execute(stmt)).scalars().first()
+    if obj is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return obj
+
+
+# -------- Users --------
+
+@router.get("/users/", response_model=List[schemas.User], tags=["Users"])
+async def list_users(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lister les utilisateurs (async)"""
+    stmt = select(models.User).options(_load_groups)
+    return await apaginate(db, stmt, models.User.id, page, response)
+
+
+@router.get("/users/{user_id:int}", response_model=schemas.User, tags=["Users"])
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Récupérer un utilisateur par ID (async)"""
+    stmt = select(models.User).options(_load_groups).where(models.User.id == user_id)
+    return await _get_or_404(db, stmt, "Utilisateur introuvable")
+
+
+# -------- Groups --------
+
+@router.get("/groups/", response_model=List[schemas.Group], tags=["Groups"])
+async def list_groups(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lister les groupes (async)"""
+    return await apaginate(db, select(models.Group), models.Group.id, page, response)
+
+
+@router.get("/groups/{group_id:int}", response_model=schemas.Group, tags=["Groups"])
+async def get_group(group_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Récupérer un groupe par ID (async)"""
+    stmt = select(models.Group).where(models.Group.id == group_id)
+    return await _get_or_404(db, stmt, "Groupe introuvable")
+
+
+@router.get("/groups/{group_id:int}/users", response_model=List[schemas.User], tags=["Groups"])
+async def get_group_users(
+    group_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lister les utilisateurs d'un groupe (async, GET conditionnel)"""
+    etag = group_users_etag(group_id, (await db.execute(group_users_fingerprint(group_id))).one())
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Groupe introuvable")
+    not_modified = conditional(request, response, etag)
+    if not_modified:
+        return not_modified
+    stmt = (
+        select(models.User)
+        .join(models.UserGroup)
+        .where(models.UserGroup.group_id == group_id)
+        .options(_load_groups)
+    )
+    return (await db.execute(stmt)).scalars().all()
+
+
+# -------- Items --------
+
+@router.get("/items/", response_model=List[schemas.Item], tags=["Items"])
+async def list_items(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lister les produits (async, pages en cache partagé avec la route sync, ETag)"""
+    key = item_page_key(page, (await db.execute(item_catalog_version())).one())
+    entry = item_page_cache.get(key)
+    if entry is None:
+        items = await apaginate(db, select(models.Item), models.Item.id, page, response)
+        entry = cache_item_page(db, key, items, response)
+    return item_page_response(request, response, entry)
+
+
+@router.get("/items/{item_id:int}", response_model=schemas.Item, tags=["Items"])
+async def get_item(
+    item_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Récupérer un produit par ID (async, cache du catalogue partagé avec la route sync)"""
+    item = item_cache.get(item_id)
+    if item is None:
+        stmt = select(models.Item).where(models.Item.id == item_id)
+        item = cache_read_item(db, await _get_or_404(db, stmt, "Produit introuvable"))
+    return conditional(request, response, make_etag("item", item["id"], item["created_at"])) or item
+
+
+# -------- Stocks --------
+
+@router.get("/stocks/", response_model=List[schemas.Stock], tags=["Stocks"])
+async def list_stocks(
+    request: Request,
+    response: Response,
+    user_id: Optional[int] = None,
+    group_id: Optional[int] = None,
+    item_id: Optional[int] = None,
+    expiring_before: Optional[date] = None,
+    min_remaining: Optional[float] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lister les stocks, filtrés en SQL (async, GET conditionnel)"""
+    conditions = stock_filters(user_id, group_id, item_id, expiring_before, min_remaining)
+    if request.headers.get("if-none-match"):
+        versions = (await db.execute(stock_page_versions(conditions, page))).all()
+        not_modified = stock_page_not_modified(request, response, page, versions)
+        if not_modified:
+            return not_modified
+    if fast_json_enabled(request):
+        stmt = select(*schema_columns(schemas.Stock, models.Stock.__table__)).where(*conditions)
+        rows = await apaginate_rows(db, stmt, models.Stock.id, page, response)
+        set_stock_page_etag(page, rows, response)
+        return fast_json_response(rows_to_dicts(rows), response)
+    stocks = await apaginate(db, select(models.Stock).where(*conditions), models.Stock.id, page, response)
+    set_stock_page_etag(page, stocks, response)
+    return stocks
+
+
+@router.get("/stocks/{stock_id:int}", response_model=schemas.Stock, tags=["Stocks"])
+async def get_stock(
+    stock_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Récupérer un stock par ID (async, GET conditionnel)"""
+    stmt = select(models.Stock).where(models.Stock.id == stock_id)
+    stock = await _get_or_404(db, stmt, "Stock introuvable")
+    return conditional(request, response, stock_etag(stock)) or stock
+
+
+# -------- Movements --------
+
+@router.get("/movements/", response_model=List[schemas.StockMovement], tags=["Stock Movements"])
+async def list_movements(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lister les mouvements de stock (async)"""
+    if fast_json_enabled(request):
+        stmt = select(*schema_columns(schemas.StockMovement, models.StockMovement.__table__))
+        rows = await apaginate_rows(db, stmt, models.StockMovement.id, page, response)
+        return fast_json_response(rows_to_dicts(rows), response)
+    stmt = select(models.StockMovement)
+    return await apaginate(db, stmt, models.StockMovement.id, page, response)
+
+
+@router.get(
+    "/movements/stock/{stock_id:int}",
+    response_model=List[schemas.StockMovement],
+    tags=["Stock Movements"],
+)
+async def list_movements_for_stock(
+    stock_id: int,
+    response: Response,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lister les mouvements d'un stock par ordre chronologique (async)"""
+    Movement = movement_source(include_archived)
+    stmt = (
+        select(models.Stock.id, Movement)
+        .outerjoin(Movement, and_(*history_conditions(since, until, cursor, Movement)))
+        .where(models.Stock.id == stock_id)
+        .order_by(Movement.created_at, Movement.id)
+        .limit(limit + 1)
+    )
+    rows = (await db.execute(stmt)).all()
+    return history_page(rows, limit, response)
+
+
+@router.get("/movements/{movement_id:int}", response_model=schemas.StockMovement, tags=["Stock Movements"])
+async def get_movement(
+    movement_id: int,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Récupérer un mouvement par ID (async)"""
+    stmt = select(models.StockMovement).where(models.StockMovement.id == movement_id)
+    movement = (await db.execute(stmt)).scalars().first()
+    if movement is None and include_archived:
+        stmt = select(models.StockMovementArchive).where(models.StockMovementArchive.id == movement_id)
+        movement = (await db.execute(stmt)).scalars().first()
+    if movement is None:
+        raise HTTPException(status_code=404, detail="Mouvement introuvable")
+    return movement
@@ -1,20 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased, selectinload
+from typing import List, Optional
 
 from app import models, schemas
-from app.database import SessionLocal
+from app.bulk_delete import BULK_DELETE_MAX_IDS, blocked_detail, bulk_delete
+from app.cache import group_inventory_cache
+from app.database import get_db, reads_replica
+from app.etag import conditional, make_etag
+from app.pagination import PageParams, paginate
 
 router = APIRouter()
 
-# Dépendance pour ouvrir/fermer une session DB
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 # -------- CRUD Groups --------
 
@@ -29,9 +26,13 @@ def create_group(group: schemas.GroupCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[schemas.Group])
-def list_groups(db: Session = Depends(get_db)):
-    """Lister tous les groupes"""
-    return db.query(models.Group).all()
+def list_groups(
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Lister les groupes (pagination par curseur: ?limit=&after=)"""
+    return paginate(db.query(models.Group), models.Group.id, page, response)
 
 
 @router.get("/{group_id}", response_model=schemas.Group)
@@ -43,6 +44,32 @@ def get_group(group_id: int, db: Session = Depends(get_db)):
     return group
 
 
+# Dépendances qui interdisent la suppression d'un groupe (colonne FK, libellé du 409)
+_GROUP_BLOCKERS = (
+    (models.UserGroup.group_id, "des utilisateurs liés"),
+    (models.Stock.group_id, "des stocks associés"),
+)
+
+
+@router.delete("/bulk", response_model=List[schemas.BulkDeleteResult])
+def delete_groups_bulk(
+    ids: List[int] = Body(..., min_length=1, max_length=BULK_DELETE_MAX_IDS),
+    db: Session = Depends(get_db),
+):
+    """Supprimer des groupes en lot (rapport par ID: 200, 404 ou 409)"""
+    report, deleted = bulk_delete(
+        db,
+        models.Group,
+        ids,
+        _GROUP_BLOCKERS,
+        blocked_prefix="le groupe",
+        not_found_detail="Groupe introuvable",
+        deleted_detail="Groupe {id} supprimé",
+    )
+    group_inventory_cache.invalidate(deleted)
+    return report
+
+
 @router.delete("/{group_id}")
 def delete_group(group_id: int, db: Session = Depends(get_db)):
     """Supprimer un groupe"""
@@ -68,10 +95,10 @@ def delete_group(group_id: int, db: Session = Depends(get_db)):
             details.append("des utilisateurs liés")
         if has_stocks:
             details.append("des stocks associés")
-        msg = "Suppression interdite: le groupe possède " + " et ".join(details)
-        raise HTTPException(status_code=409, detail=msg)
+        raise HTTPException(status_code=409, detail=blocked_detail("le groupe", details))
     db.delete(group)
     db.commit()
+    group_inventory_cache.invalidate([group_id])
     return {"message": f"Groupe {group_id} supprimé"}
 
 
@@ -95,22 +122,102 @@ def add_user_to_group(user_group: schemas.UserGroupCreate, db: Session = Depends
     return new_link
 
 
+def group_users_fingerprint(group_id: int):
+    """Agrégats des appartenances de tous les membres du groupe (sérialisées par schemas.User).
+
+    Une seule ligne: existence du groupe, count, sommes des IDs et max(changed_at). Un rôle
+    ne change que par suppression puis ajout: l'ajout porte un changed_at plus récent.
+    """
+    member = aliased(models.UserGroup)
+    membership = aliased(models.UserGroup)
+    return (
+        select(
+            func.count(func.distinct(models.Group.id)),
+            func.count(membership.user_id),
+            func.sum(membership.user_id),
+            func.sum(membership.group_id),
+            func.max(membership.changed_at),
+        )
+        .select_from(models.Group)
+        .outerjoin(member, member.group_id == models.Group.id)
+        .outerjoin(membership, membership.user_id == member.user_id)
+        .where(models.Group.id == group_id)
+    )
+
+
+def group_users_etag(group_id: int, row) -> Optional[str]:
+    """ETag des membres d'un groupe d'après la ligne de `group_users_fingerprint` (None: groupe absent)"""
+    exists, *aggregates = row
+    if not exists:
+        return None
+    return make_etag("group_users", group_id, *aggregates)
+
+
 @router.get("/{group_id}/users", response_model=List[schemas.User])
-def get_group_users(group_id: int, db: Session = Depends(get_db)):
-    """Lister les utilisateurs d'un groupe"""
-    group = db.query(models.Group).filter(models.Group.id == group_id).first()
-    if not group:
+def get_group_users(group_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Lister les utilisateurs d'un groupe (GET conditionnel via ETag)"""
+    etag = group_users_etag(group_id, db.execute(group_users_fingerprint(group_id)).one())
+    if etag is None:
         raise HTTPException(status_code=404, detail="Groupe introuvable")
+    not_modified = conditional(request, response, etag)
+    if not_modified:
+        return not_modified
 
+    # Appartenances chargées en lot pour éviter 2 lazy loads par utilisateur
     users = (
         db.query(models.User)
         .join(models.UserGroup)
         .filter(models.UserGroup.group_id == group_id)
+        .options(selectinload(models.User.groups).selectinload(models.UserGroup.group))
         .all()
     )
     return users
 
 
+@router.get("/{group_id}/inventory", response_model=List[schemas.GroupInventoryLine])
+def get_group_inventory(group_id: int, db: Session = Depends(get_db)):
+    """Quantité restante totale par produit pour un groupe (mise en cache)"""
+    cached = group_inventory_cache.get(group_id)
+    if cached is not None:
+        return cached
+    # Relevée avant la lecture: une écriture invalidée pendant celle-ci empêche la mise en cache
+    generation = group_inventory_cache.generation
+
+    group = db.query(models.Group.id).filter(models.Group.id == group_id).first()
+    if not group:
+        raise HTTPException(status_code=404, detail="Groupe introuvable")
+
+    rows = (
+        db.query(
+            models.Item.id,
+            models.Item.name,
+            models.Item.unit,
+            func.sum(models.Stock.remaining_quantity),
+            func.count(models.Stock.id),
+        )
+        .select_from(models.Stock)
+        .join(models.Item, models.Item.id == models.Stock.item_id)
+        .filter(models.Stock.group_id == group_id)
+        .group_by(models.Item.id, models.Item.name, models.Item.unit)
+        .order_by(models.Item.id)
+        .all()
+    )
+    inventory = [
+        {
+            "item_id": item_id,
+            "item_name": name,
+            "unit": unit,
+            "total_remaining": float(total or 0),
+            "stock_count": count,
+        }
+        for item_id, name, unit, total, count in rows
+    ]
+    # Lecture sur réplica: pas de mise en cache (voir database.reads_replica)
+    if not reads_replica(db):
+        group_inventory_cache.set(group_id, inventory, generation=generation)
+    return inventory
+
+
 @router.delete("/{group_id}/users/{user_id}")
 def remove_user_from_group(group_id: int, user_id: int, db: Session = Depends(get_db)):
     """Retirer un utilisateur d'un groupe"""
@@ -0,0 +1,52 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+
+from app import database, slow_queries
+from app.cache import CACHES
+from app.settings import Settings, app_settings
+
+
+def require_internal_token(
+    x_internal_token: Optional[str] = Header(None),
+    settings: Settings = Depends(app_settings),
+) -> None:
+    """Jeton INTERNAL_TOKEN exigé s'il est configuré (en-tête X-Internal-Token)"""
+    expected = settings.internal_token
+    if expected and not secrets.compare_digest(x_internal_token or "", expected):
+        raise HTTPException(status_code=401, detail="Jeton interne invalide")
+
+
+# Monté seulement si INTERNAL_ENDPOINTS=1 (voir create_app)
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+# -------- Observabilité interne --------
+
+@router.get("/pool")
+def get_pool_stats():
+    """Statistiques des pools de connexions du worker (dimensionnement par worker)"""
+    stats = {"sync": database.pool_stats(database.get_engine())}
+    readers = database.read_engines()
+    if readers:
+        stats["readers"] = [database.pool_stats(read_engine) for read_engine in readers]
+    if database._async_engine is not None:
+        stats["async"] = database.pool_stats(database._async_engine.sync_engine)
+    if database._async_read_engines:
+        stats["async_readers"] = [
+            database.pool_stats(read_engine.sync_engine) for read_engine in database._async_read_engines
+        ]
+    return stats
+
+
+@router.get("/cache")
+def get_cache_stats():
+    """Compteurs des caches en mémoire du worker (taille, hits, misses, évictions)"""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+@router.get("/slow-queries")
+def get_slow_queries(settings: Settings = Depends(app_settings)):
+    """Dernières requêtes SQL lentes du worker (SQL, forme des paramètres, durée, route, plan)"""
+    return {"threshold_ms": settings.slow_query_ms, "queries": slow_queries.recent_slow_queries()}
@@ -1,20 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import List
 
 from app import models, schemas
-from app.database import SessionLocal
+from app.bulk_delete import BULK_DELETE_MAX_IDS, blocked_detail, bulk_delete
+from app.cache import cache_item, get_cached_item, invalidate_item, invalidate_items, item_page_cache
+from app.database import get_db, reads_replica
+from app.etag import conditional, make_etag
+from app.pagination import NEXT_CURSOR_HEADER, PageParams, paginate
 
 router = APIRouter()
 
-# Dépendance pour la session DB
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 # -------- CRUD Items --------
 
@@ -25,22 +22,89 @@ def create_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
     db.add(new_item)
     db.commit()
     db.refresh(new_item)
-    return new_item
+    # Write-through: la fiche est en cache, les pages de liste sont périmées
+    item_page_cache.clear()
+    return cache_item(new_item)
+
+
+def item_catalog_version():
+    """Sonde bon marché du catalogue, (count, max(id)) sur l'index primaire.
+
+    Elle entre dans la clé des pages en cache: un produit créé ou supprimé sur un autre
+    worker change la clé, la page est relue au lieu d'attendre le TTL.
+    """
+    return select(func.count(models.Item.id), func.max(models.Item.id))
+
+
+def item_page_key(page: PageParams, version) -> tuple:
+    return (page.limit, page.after, *version)
+
+
+def cache_item_page(db, key: tuple, items: list, response: Response) -> tuple:
+    """Page de produits lue par `db`: (lignes sérialisées, curseur suivant), mise en cache
+    sauf si elle vient d'un réplica"""
+    entry = (
+        [schemas.Item.model_validate(i).model_dump() for i in items],
+        response.headers.get(NEXT_CURSOR_HEADER),
+    )
+    if not reads_replica(db):
+        item_page_cache.set(key, entry)
+    return entry
+
+
+def item_page_response(request: Request, response: Response, entry: tuple):
+    """Page de produits (en cache) avec curseur et ETag, ou 304 (partagé avec la route async)"""
+    rows, next_cursor = entry
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    # Produits immuables: les IDs de la page suffisent à l'empreinte
+    etag = make_etag("items", [row["id"] for row in rows], next_cursor)
+    return conditional(request, response, etag) or rows
 
 
 @router.get("/", response_model=List[schemas.Item])
-def list_items(db: Session = Depends(get_db)):
-    """Lister tous les produits"""
-    return db.query(models.Item).all()
+def list_items(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Lister les produits (pagination par curseur: ?limit=&after=, pages mises en cache)"""
+    key = item_page_key(page, db.execute(item_catalog_version()).one())
+    entry = item_page_cache.get(key)
+    if entry is None:
+        items = paginate(db.query(models.Item), models.Item.id, page, response)
+        entry = cache_item_page(db, key, items, response)
+    return item_page_response(request, response, entry)
 
 
 @router.get("/{item_id}", response_model=schemas.Item)
-def get_item(item_id: int, db: Session = Depends(get_db)):
-    """Récupérer un produit par ID"""
-    item = db.query(models.Item).filter(models.Item.id == item_id).first()
-    if not item:
+def get_item(item_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Récupérer un produit par ID (cache LRU/TTL, GET conditionnel via ETag)"""
+    item = get_cached_item(db, item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Produit introuvable")
-    return item
+    return conditional(request, response, make_etag("item", item["id"], item["created_at"])) or item
+
+
+@router.delete("/bulk", response_model=List[schemas.BulkDeleteResult])
+def delete_items_bulk(
+    ids: List[int] = Body(..., min_length=1, max_length=BULK_DELETE_MAX_IDS),
+    db: Session = Depends(get_db),
+):
+    """Supprimer des produits en lot (rapport par ID: 200, 404 ou 409)"""
+    report, deleted = bulk_delete(
+        db,
+        models.Item,
+        ids,
+        [(models.Stock.item_id, "des stocks associés")],
+        blocked_prefix="le produit",
+        not_found_detail="Produit introuvable",
+        deleted_detail="Produit {id} supprimé",
+    )
+    if deleted:
+        invalidate_items(deleted)
+    return report
 
 
 @router.delete("/{item_id}")
@@ -59,8 +123,9 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
     if has_stocks:
         raise HTTPException(
             status_code=409,
-            detail="Suppression interdite: le produit possède des stocks associés",
+            detail=blocked_detail("le produit", ["des stocks associés"]),
         )
     db.delete(item)
     db.commit()
+    invalidate_item(item_id)
     return {"message": f"Produit {item_id} supprimé"}
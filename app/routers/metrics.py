@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import render
+
+router = APIRouter()
+
+# Type de contenu attendu par Prometheus pour le format texte
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """Métriques du worker au format texte Prometheus (latences, statuts, requêtes SQL)"""
+    return PlainTextResponse(render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,42 +1,137 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from app import models, schemas
-from app.database import SessionLocal
+from app.archive import movement_source
+from app.database import get_db
+from app.export import ExportFormat, export_response
+from app.fastjson import fast_json_enabled, fast_json_response, rows_to_dicts, schema_columns
+from app.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    PageParams,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    paginate_rows,
+)
 
 router = APIRouter()
 
-# Dépendance pour la session DB
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+
+def history_conditions(
+    since: Optional[datetime],
+    until: Optional[datetime],
+    cursor: Optional[str],
+    Movement=models.StockMovement,
+) -> list:
+    """Conditions de jointure Stock -> StockMovement pour l'historique paginé
+
+    `Movement` est la source des mouvements (voir app.archive.movement_source).
+    """
+    conditions = [Movement.stock_id == models.Stock.id]
+    if since is not None:
+        conditions.append(Movement.created_at >= since)
+    if until is not None:
+        conditions.append(Movement.created_at < until)
+    if cursor is not None:
+        raw_created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            last_created_at = datetime.fromisoformat(raw_created_at)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Curseur invalide")
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Curseur invalide")
+        conditions.append(
+            or_(
+                Movement.created_at > last_created_at,
+                and_(Movement.created_at == last_created_at, Movement.id > last_id),
+            )
+        )
+    return conditions
+
+
+def history_page(rows: list, limit: int, response: Response) -> list:
+    """Transforme les lignes (stock_id, mouvement) en page; 404 si le stock n'existe pas"""
+    if not rows:
+        raise HTTPException(status_code=404, detail="Stock introuvable")
+    movements = [movement for _, movement in rows if movement is not None]
+    if len(movements) > limit:
+        movements = movements[:limit]
+        last = movements[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at.isoformat(), last.id)
+    return movements
 
 
 # -------- Lecture des mouvements --------
 
 @router.get("/", response_model=List[schemas.StockMovement])
-def list_movements(db: Session = Depends(get_db)):
-    """Lister tous les mouvements de stock"""
-    return db.query(models.StockMovement).all()
+def list_movements(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Lister les mouvements de stock (pagination par curseur: ?limit=&after=)"""
+    if fast_json_enabled(request):
+        stmt = select(*schema_columns(schemas.StockMovement, models.StockMovement.__table__))
+        rows = paginate_rows(db, stmt, models.StockMovement.id, page, response)
+        return fast_json_response(rows_to_dicts(rows), response)
+    return paginate(db.query(models.StockMovement), models.StockMovement.id, page, response)
+
+
+@router.get("/export")
+def export_movements(format: ExportFormat = "ndjson", db: Session = Depends(get_db)):
+    """Exporter tous les mouvements en flux (NDJSON ou CSV)"""
+    table = models.StockMovement.__table__
+    stmt = select(*table.columns).order_by(table.c.id)
+    return export_response(db, stmt, format, "movements")
 
 
 @router.get("/stock/{stock_id}", response_model=List[schemas.StockMovement])
-def list_movements_for_stock(stock_id: int, db: Session = Depends(get_db)):
-    """Lister les mouvements associés à un stock"""
-    stock = db.query(models.Stock).filter(models.Stock.id == stock_id).first()
-    if not stock:
-        raise HTTPException(status_code=404, detail="Stock introuvable")
-    return db.query(models.StockMovement).filter(models.StockMovement.stock_id == stock_id).all()
+def list_movements_for_stock(
+    stock_id: int,
+    response: Response,
+    since: Optional[datetime] = Query(None, description="Borne basse incluse sur created_at"),
+    until: Optional[datetime] = Query(None, description="Borne haute exclue sur created_at"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Curseur opaque renvoyé dans X-Next-Cursor"),
+    include_archived: bool = Query(False, description="Inclure les mouvements archivés"),
+    db: Session = Depends(get_db),
+):
+    """Lister les mouvements d'un stock par ordre chronologique (created_at, id)"""
+    # Un seul aller-retour: la ligne du stock (jointure externe) prouve son existence,
+    # les mouvements sont parcourus via l'index (stock_id, created_at, id).
+    Movement = movement_source(include_archived)
+    rows = (
+        db.query(models.Stock.id, Movement)
+        .outerjoin(Movement, and_(*history_conditions(since, until, cursor, Movement)))
+        .filter(models.Stock.id == stock_id)
+        .order_by(Movement.created_at, Movement.id)
+        .limit(limit + 1)
+        .all()
+    )
+    return history_page(rows, limit, response)
 
 
 @router.get("/{movement_id}", response_model=schemas.StockMovement)
-def get_movement(movement_id: int, db: Session = Depends(get_db)):
+def get_movement(
+    movement_id: int,
+    include_archived: bool = Query(False, description="Chercher aussi dans l'archive"),
+    db: Session = Depends(get_db),
+):
     """Récupérer un mouvement par ID"""
     movement = db.query(models.StockMovement).filter(models.StockMovement.id == movement_id).first()
+    if not movement and include_archived:
+        movement = (
+            db.query(models.StockMovementArchive)
+            .filter(models.StockMovementArchive.id == movement_id)
+            .first()
+        )
     if not movement:
         raise HTTPException(status_code=404, detail="Mouvement introuvable")
     return movement
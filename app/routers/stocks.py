@@ -1,19 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional, Set
 
 from app import models, schemas
-from app.database import SessionLocal
+from app.balances import balance_at, maintain_checkpoints
+from app.cache import invalidate_group_inventory
+from app.database import get_db
+from app.etag import conditional, make_etag, page_versions
+from app.export import ExportFormat, export_response
+from app.fastjson import fast_json_enabled, fast_json_response, rows_to_dicts, schema_columns
+from app.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, PageParams, paginate, paginate_rows
 
 router = APIRouter()
 
-# Dépendance pour la session DB
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Nombre maximal de lignes acceptées par les endpoints de lot
+BULK_MAX_ROWS = 5000
+
+
+def stock_filters(
+    user_id: Optional[int] = None,
+    group_id: Optional[int] = None,
+    item_id: Optional[int] = None,
+    expiring_before: Optional[date] = None,
+    min_remaining: Optional[float] = None,
+) -> list:
+    """Conditions SQL des filtres de liste (servies par les index de models.Stock)"""
+    conditions = []
+    if user_id is not None:
+        conditions.append(models.Stock.user_id == user_id)
+    if group_id is not None:
+        conditions.append(models.Stock.group_id == group_id)
+    if item_id is not None:
+        conditions.append(models.Stock.item_id == item_id)
+    if expiring_before is not None:
+        conditions.append(models.Stock.expiration_date < expiring_before)
+    if min_remaining is not None:
+        conditions.append(models.Stock.remaining_quantity >= Decimal(str(min_remaining)))
+    return conditions
+
+
+def stock_page_versions(conditions: list, page: PageParams):
+    """Lignes de version d'une page de stocks (id, updated_at, remaining_quantity).
+
+    Lues seulement si le client envoie If-None-Match. La quantité par ligne complète
+    `updated_at` (précision à la seconde): un transfert dans la même seconde change l'ETag.
+    """
+    return page_versions(
+        models.Stock.id, [models.Stock.updated_at, models.Stock.remaining_quantity], conditions, page
+    )
+
+
+def stock_page_etag(page: PageParams, rows, has_next: bool) -> str:
+    """ETag d'une page de stocks d'après ses lignes (ORM, colonnes ou lignes de version)"""
+    versions = [(row.id, row.updated_at, row.remaining_quantity) for row in rows]
+    return make_etag("stocks", page.limit, page.after, versions, has_next)
+
+
+def stock_page_not_modified(request: Request, response: Response, page: PageParams, versions):
+    """304 si la page n'a pas changé depuis l'ETag du client (lignes de `stock_page_versions`)"""
+    etag = stock_page_etag(page, versions[: page.limit], len(versions) > page.limit)
+    return conditional(request, response, etag)
+
+
+def set_stock_page_etag(page: PageParams, rows, response: Response) -> None:
+    """ETag d'une page servie, calculé sur les lignes déjà lues (aucune requête de plus)"""
+    response.headers["ETag"] = stock_page_etag(page, rows, NEXT_CURSOR_HEADER in response.headers)
+
+
+def stock_etag(stock) -> str:
+    return make_etag("stock", stock.id, stock.updated_at, stock.remaining_quantity)
+
+
+def _existing_item_ids(db: Session, item_ids: Set[int]) -> Set[int]:
+    """IDs de produits existants, lus en base (une requête): pas le cache du catalogue, propre au
+    worker, qui ignore les suppressions faites ailleurs"""
+    return set(db.scalars(select(models.Item.id).where(models.Item.id.in_(item_ids))))
+
+
+def _multirow_returning(db: Session) -> bool:
+    """Le dialecte sait-il renvoyer les IDs d'un INSERT multi-lignes ?"""
+    return db.get_bind().dialect.insert_executemany_returning
 
 
 # -------- CRUD Stocks --------
@@ -21,8 +90,8 @@ def get_db():
 @router.post("/", response_model=schemas.Stock)
 def create_stock(stock: schemas.StockCreate, db: Session = Depends(get_db)):
     """Créer un stock (stock + mouvement initial atomiques)"""
-    item = db.query(models.Item).filter(models.Item.id == stock.item_id).first()
-    if not item:
+    # Existence du produit en base (404 plutôt qu'une erreur de FK)
+    if not _existing_item_ids(db, {stock.item_id}):
         raise HTTPException(status_code=404, detail="Item introuvable")
 
     new_stock = models.Stock(**stock.model_dump())
@@ -37,7 +106,10 @@ def create_stock(stock: schemas.StockCreate, db: Session = Depends(get_db)):
             note="Stock initial créé",
         )
         db.add(movement)
+        db.flush()
+        maintain_checkpoints(db, [new_stock.id])
         db.commit()
+        invalidate_group_inventory([stock.group_id])
     except Exception:
         db.rollback()
         raise
@@ -47,19 +119,221 @@ def create_stock(stock: schemas.StockCreate, db: Session = Depends(get_db)):
     return new_stock
 
 
+@router.post("/bulk", response_model=List[schemas.Stock])
+def create_stocks_bulk(
+    stocks: List[schemas.StockCreate] = Body(..., min_length=1, max_length=BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    """Créer des stocks en lot (stocks + mouvements initiaux dans une seule transaction)"""
+    # Validation de tous les produits en une requête
+    item_ids = {s.item_id for s in stocks}
+    missing = sorted(item_ids - _existing_item_ids(db, item_ids))
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Item introuvable: {', '.join(map(str, missing))}",
+        )
+
+    rows = [s.model_dump() for s in stocks]
+    try:
+        if _multirow_returning(db):
+            # INSERT multi-lignes ... RETURNING (SQLite, MariaDB >= 10.5)
+            created = db.execute(
+                insert(models.Stock).returning(models.Stock.id, models.Stock.initial_quantity),
+                rows,
+            ).all()
+        else:
+            # MySQL sans RETURNING: flush ORM pour obtenir les IDs (même transaction)
+            new_stocks = [models.Stock(**row) for row in rows]
+            db.add_all(new_stocks)
+            db.flush()
+            created = [(s.id, s.initial_quantity) for s in new_stocks]
+        # Tous les mouvements initiaux en un seul INSERT (executemany)
+        db.execute(
+            insert(models.StockMovement),
+            [
+                {"stock_id": stock_id, "change_quantity": quantity, "note": "Stock initial créé"}
+                for stock_id, quantity in created
+            ],
+        )
+        maintain_checkpoints(db, [stock_id for stock_id, _ in created])
+        db.commit()
+        invalidate_group_inventory({s.group_id for s in stocks})
+    except Exception:
+        db.rollback()
+        raise
+
+    # Recharger les colonnes générées en une requête (au lieu d'un refresh par ligne)
+    ids = [stock_id for stock_id, _ in created]
+    return (
+        db.query(models.Stock)
+        .filter(models.Stock.id.in_(ids))
+        .order_by(models.Stock.id)
+        .all()
+    )
+
+
 @router.get("/", response_model=List[schemas.Stock])
-def list_stocks(db: Session = Depends(get_db)):
-    """Lister tous les stocks"""
-    return db.query(models.Stock).all()
+def list_stocks(
+    request: Request,
+    response: Response,
+    user_id: Optional[int] = None,
+    group_id: Optional[int] = None,
+    item_id: Optional[int] = None,
+    expiring_before: Optional[date] = Query(None, description="Date de péremption strictement antérieure"),
+    min_remaining: Optional[float] = Query(None, description="Quantité restante minimale"),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Lister les stocks, filtrés en SQL (pagination par curseur: ?limit=&after=)"""
+    conditions = stock_filters(user_id, group_id, item_id, expiring_before, min_remaining)
+    if request.headers.get("if-none-match"):
+        versions = db.execute(stock_page_versions(conditions, page)).all()
+        not_modified = stock_page_not_modified(request, response, page, versions)
+        if not_modified:
+            return not_modified
+    if fast_json_enabled(request):
+        stmt = select(*schema_columns(schemas.Stock, models.Stock.__table__)).where(*conditions)
+        rows = paginate_rows(db, stmt, models.Stock.id, page, response)
+        set_stock_page_etag(page, rows, response)
+        return fast_json_response(rows_to_dicts(rows), response)
+    stocks = paginate(db.query(models.Stock).filter(*conditions), models.Stock.id, page, response)
+    set_stock_page_etag(page, stocks, response)
+    return stocks
+
+
+@router.get("/export")
+def export_stocks(format: ExportFormat = "ndjson", db: Session = Depends(get_db)):
+    """Exporter tous les stocks en flux (NDJSON ou CSV)"""
+    table = models.Stock.__table__
+    stmt = select(*table.columns).order_by(table.c.id)
+    return export_response(db, stmt, format, "stocks")
+
+
+@router.get("/expiring", response_model=List[schemas.Stock])
+def list_expiring_stocks(
+    days: int = Query(7, ge=0, le=365, description="Horizon en jours à partir d'aujourd'hui"),
+    user_id: Optional[int] = Query(None, description="Stocks de l'utilisateur et de ses groupes"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    """Lister les stocks non vides qui périment dans les `days` prochains jours"""
+    today = date.today()
+
+    def expiring(query):
+        return query.filter(
+            models.Stock.expiration_date >= today,
+            models.Stock.expiration_date <= today + timedelta(days=days),
+            models.Stock.remaining_quantity > 0,
+        )
+
+    if user_id is None:
+        query = expiring(db.query(models.Stock))
+    else:
+        # Deux branches indexées ((user_id|group_id, expiration_date)) plutôt qu'un OR
+        member_groups = (
+            db.query(models.UserGroup.group_id)
+            .filter(models.UserGroup.user_id == user_id)
+        )
+        query = expiring(db.query(models.Stock).filter(models.Stock.user_id == user_id)).union(
+            expiring(db.query(models.Stock).filter(models.Stock.group_id.in_(member_groups)))
+        )
+    return (
+        query.order_by(models.Stock.expiration_date, models.Stock.id)
+        .limit(limit)
+        .all()
+    )
 
 
 @router.get("/{stock_id}", response_model=schemas.Stock)
-def get_stock(stock_id: int, db: Session = Depends(get_db)):
-    """Récupérer un stock par ID"""
+def get_stock(stock_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Récupérer un stock par ID (GET conditionnel via ETag)"""
     stock = db.query(models.Stock).filter(models.Stock.id == stock_id).first()
     if not stock:
         raise HTTPException(status_code=404, detail="Stock introuvable")
-    return stock
+    return conditional(request, response, stock_etag(stock)) or stock
+
+
+@router.get("/{stock_id}/balance", response_model=schemas.StockBalance)
+def get_stock_balance(
+    stock_id: int,
+    at: Optional[datetime] = Query(None, description="Date du solde (défaut: maintenant)"),
+    db: Session = Depends(get_db),
+):
+    """Solde d'un stock à une date (checkpoint le plus proche + mouvements suivants)"""
+    balance = balance_at(db, stock_id, at)
+    if balance is None:
+        raise HTTPException(status_code=404, detail="Stock introuvable")
+    return {"stock_id": stock_id, "at": at or datetime.now(), "balance": balance}
+
+
+@router.put("/batch", response_model=List[schemas.Stock])
+def update_stocks_batch(
+    adjustments: List[schemas.StockAdjustment] = Body(..., min_length=1, max_length=BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    """
+    Appliquer plusieurs ajustements de quantité en une transaction (tout ou rien).
+
+    Les lignes sont verrouillées dans l'ordre des IDs (pas d'interblocage entre
+    deux lots concurrents); les erreurs sont rapportées ligne par ligne.
+    """
+    ids = sorted({a.stock_id for a in adjustments})
+    try:
+        locked = {
+            s.id: s
+            for s in db.query(models.Stock)
+            .filter(models.Stock.id.in_(ids))
+            .order_by(models.Stock.id)
+            .with_for_update()
+        }
+
+        # Application cumulative dans l'ordre de la requête
+        remaining = {stock_id: stock.remaining_quantity for stock_id, stock in locked.items()}
+        errors = []
+        movements = []
+        for index, adj in enumerate(adjustments):
+            if adj.stock_id not in remaining:
+                errors.append({"index": index, "stock_id": adj.stock_id, "detail": "Stock introuvable"})
+                continue
+            change_decimal = Decimal(str(adj.change))
+            new_remaining = remaining[adj.stock_id] + change_decimal
+            if new_remaining < 0:
+                errors.append({"index": index, "stock_id": adj.stock_id, "detail": "Quantité insuffisante"})
+                continue
+            remaining[adj.stock_id] = new_remaining
+            movements.append(
+                {
+                    "stock_id": adj.stock_id,
+                    "change_quantity": change_decimal,
+                    "note": adj.note or "Mise à jour de la quantité",
+                }
+            )
+        if errors:
+            db.rollback()
+            not_found = all(e["detail"] == "Stock introuvable" for e in errors)
+            raise HTTPException(status_code=404 if not_found else 400, detail=errors)
+
+        for stock_id, stock in locked.items():
+            stock.remaining_quantity = remaining[stock_id]
+        db.flush()
+        db.execute(insert(models.StockMovement), movements)
+        maintain_checkpoints(db, ids)
+        touched_groups = {stock.group_id for stock in locked.values()}
+        db.commit()
+        invalidate_group_inventory(touched_groups)
+    except HTTPException:
+        raise
+    except Exception:
+        db.rollback()
+        raise
+
+    return (
+        db.query(models.Stock)
+        .filter(models.Stock.id.in_(ids))
+        .order_by(models.Stock.id)
+        .all()
+    )
 
 
 @router.put("/{stock_id}", response_model=schemas.Stock)
@@ -67,34 +341,61 @@ def update_stock_quantity(stock_id: int, change: float, db: Session = Depends(ge
     """
     Mettre à jour la quantité restante d'un stock et enregistrer
     le mouvement associé dans une seule transaction (atomique).
-    """
-    stock = db.query(models.Stock).filter(models.Stock.id == stock_id).first()
-    if not stock:
-        raise HTTPException(status_code=404, detail="Stock introuvable")
 
-    from decimal import Decimal
+    Le contrôle et la mise à jour sont faits par un seul UPDATE conditionnel
+    (`WHERE remaining_quantity + :change >= 0`): la base sérialise les
+    consommations concurrentes, aucune mise à jour n'est perdue.
+    """
     change_decimal = Decimal(str(change))
-    new_remaining = stock.remaining_quantity + change_decimal
-    if new_remaining < 0:
-        raise HTTPException(status_code=400, detail="Quantité insuffisante")
+    stmt = (
+        update(models.Stock)
+        .where(
+            models.Stock.id == stock_id,
+            models.Stock.remaining_quantity + change_decimal >= 0,
+        )
+        .values(remaining_quantity=models.Stock.remaining_quantity + change_decimal)
+        .execution_options(synchronize_session=False)
+    )
+    returning = db.get_bind().dialect.update_returning
+    if returning:
+        stmt = stmt.returning(*models.Stock.__table__.columns)
 
-    # Transaction unique pour mise à jour + mouvement (compatible session déjà ouverte)
     try:
-        stock.remaining_quantity = new_remaining
-        movement = models.StockMovement(
-            stock_id=stock.id,
-            change_quantity=change_decimal,
-            note="Mise à jour de la quantité",
+        result = db.execute(stmt)
+        if returning:
+            row = result.first()
+            updated = row is not None
+        else:
+            row = None
+            updated = result.rowcount > 0
+        if not updated:
+            # Échec: stock absent ou quantité insuffisante (chemin rare, requête de diagnostic)
+            exists = db.query(models.Stock.id).filter(models.Stock.id == stock_id).first()
+            db.rollback()
+            if not exists:
+                raise HTTPException(status_code=404, detail="Stock introuvable")
+            raise HTTPException(status_code=400, detail="Quantité insuffisante")
+        if row is None:
+            # MySQL sans RETURNING: relire la ligne, verrouillée par notre UPDATE
+            row = db.execute(
+                select(*models.Stock.__table__.columns).where(models.Stock.id == stock_id)
+            ).first()
+        db.execute(
+            insert(models.StockMovement).values(
+                stock_id=stock_id,
+                change_quantity=change_decimal,
+                note="Mise à jour de la quantité",
+            )
         )
-        db.add(movement)
+        maintain_checkpoints(db, [stock_id])
         db.commit()
+        invalidate_group_inventory([row.group_id])
+    except HTTPException:
+        raise
     except Exception:
         db.rollback()
         raise
-    finally:
-        # Rafraîchir pour refléter les valeurs mises à jour (p.ex. updated_at)
-        db.refresh(stock)
-    return stock
+    return row
 
 
 @router.delete("/{stock_id}")
@@ -103,6 +404,8 @@ def delete_stock(stock_id: int, db: Session = Depends(get_db)):
     stock = db.query(models.Stock).filter(models.Stock.id == stock_id).first()
     if not stock:
         raise HTTPException(status_code=404, detail="Stock introuvable")
+    group_id = stock.group_id
     db.delete(stock)
     db.commit()
+    invalidate_group_inventory([group_id])
     return {"message": f"Stock {stock_id} supprimé"}
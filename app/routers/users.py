@@ -1,19 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 
 from app import models, schemas
-from app.database import SessionLocal
+from app.bulk_delete import BULK_DELETE_MAX_IDS, blocked_detail, bulk_delete
+from app.database import get_db
+from app.pagination import PageParams, paginate
 
 router = APIRouter()
 
-# Dépendance pour injecter une session DB dans les routes
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Chargement anticipé des appartenances (User.groups -> UserGroup.group) sérialisées
+# par schemas.User: 3 requêtes au total quel que soit le nombre d'utilisateurs.
+_load_groups = selectinload(models.User.groups).selectinload(models.UserGroup.group)
 
 
 # -------- CRUD Users --------
@@ -32,20 +30,55 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[schemas.User])
-def list_users(db: Session = Depends(get_db)):
-    """Lister tous les utilisateurs"""
-    return db.query(models.User).all()
+def list_users(
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Lister les utilisateurs (pagination par curseur: ?limit=&after=)"""
+    query = db.query(models.User).options(_load_groups)
+    return paginate(query, models.User.id, page, response)
 
 
 @router.get("/{user_id}", response_model=schemas.User)
 def get_user(user_id: int, db: Session = Depends(get_db)):
     """Récupérer un utilisateur par ID"""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = (
+        db.query(models.User)
+        .options(_load_groups)
+        .filter(models.User.id == user_id)
+        .first()
+    )
     if not user:
         raise HTTPException(status_code=404, detail="Utilisateur introuvable")
     return user
 
 
+# Dépendances qui interdisent la suppression d'un utilisateur (colonne FK, libellé du 409)
+_USER_BLOCKERS = (
+    (models.UserGroup.user_id, "des appartenances à des groupes"),
+    (models.Stock.user_id, "des stocks associés"),
+)
+
+
+@router.delete("/bulk", response_model=List[schemas.BulkDeleteResult])
+def delete_users_bulk(
+    ids: List[int] = Body(..., min_length=1, max_length=BULK_DELETE_MAX_IDS),
+    db: Session = Depends(get_db),
+):
+    """Supprimer des utilisateurs en lot (rapport par ID: 200, 404 ou 409)"""
+    report, _ = bulk_delete(
+        db,
+        models.User,
+        ids,
+        _USER_BLOCKERS,
+        blocked_prefix="l'utilisateur",
+        not_found_detail="Utilisateur introuvable",
+        deleted_detail="Utilisateur {id} supprimé",
+    )
+    return report
+
+
 @router.delete("/{user_id}")
 def delete_user(user_id: int, db: Session = Depends(get_db)):
     """Supprimer un utilisateur"""
@@ -71,8 +104,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
             details.append("des appartenances à des groupes")
         if has_stocks:
             details.append("des stocks associés")
-        msg = "Suppression interdite: l'utilisateur possède " + " et ".join(details)
-        raise HTTPException(status_code=409, detail=msg)
+        raise HTTPException(status_code=409, detail=blocked_detail("l'utilisateur", details))
     db.delete(user)
     db.commit()
     return {"message": f"Utilisateur {user_id} supprimé"}
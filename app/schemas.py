@@ -21,6 +21,15 @@ class Group(GroupBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class GroupInventoryLine(BaseModel):
+    """Quantité restante totale d'un produit dans un groupe"""
+    item_id: int
+    item_name: str
+    unit: Optional[str] = None
+    total_remaining: float
+    stock_count: int
+
+
 # ---------- USER_GROUPS ----------
 class UserGroupBase(BaseModel):
     user_id: int
@@ -104,6 +113,20 @@ class Stock(StockBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class StockBalance(BaseModel):
+    """Solde d'un stock à une date donnée"""
+    stock_id: int
+    at: datetime
+    balance: float
+
+
+class StockAdjustment(BaseModel):
+    """Ligne d'un ajustement de quantité en lot"""
+    stock_id: int
+    change: float
+    note: Optional[str] = None
+
+
 # ---------- STOCK_MOVEMENTS ----------
 class StockMovementBase(BaseModel):
     stock_id: int
@@ -121,3 +144,11 @@ class StockMovement(StockMovementBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+
+
+# ---------- SUPPRESSIONS EN LOT ----------
+class BulkDeleteResult(BaseModel):
+    """Résultat par ID d'une suppression en lot (statuts de la suppression unitaire)"""
+    id: int
+    status_code: int
+    detail: str
@@ -0,0 +1,117 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+from dotenv import load_dotenv
+from fastapi import Request
+
+# Charger les variables depuis le fichier .env, avant tout module qui lit l'environnement
+# à l'import (tailles de caches, archivage). Pas d'engine ni de driver ici: rien de coûteux.
+load_dotenv()
+
+
+def env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes")
+
+
+# Récupération des infos depuis l'environnement
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "3306")
+DB_NAME = os.getenv("DB_NAME", "fridgey")
+DB_NAME_TEST = os.getenv("DB_NAME_TEST", f"{DB_NAME}_test")
+
+# Construction de l’URL de connexion pour MariaDB/MySQL
+DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+TEST_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME_TEST}"
+
+# Mode asynchrone (opt-in): DB_ASYNC=1 sert les routes de lecture en `async def`
+# sur une AsyncSession (aiomysql en production, aiosqlite dans les TU).
+DB_ASYNC = env_flag("DB_ASYNC")
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+)
+
+# Dimensionnement du pool (par worker): taille, débordement, recyclage, attente max
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", "1")
+
+# Réplicas de lecture (optionnel): URLs séparées par des virgules, servies à tour de rôle
+# aux GET; fenêtre pendant laquelle un client qui vient d'écrire relit sur le primaire
+DATABASE_READ_URLS = tuple(u.strip() for u in os.getenv("DATABASE_READ_URLS", "").split(",") if u.strip())
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# Mêmes réplicas pour le mode DB_ASYNC, avec un driver async (ex: mysql+aiomysql://...);
+# vide: les routes async lisent sur ASYNC_DATABASE_URL
+ASYNC_DATABASE_READ_URLS = tuple(
+    u.strip() for u in os.getenv("ASYNC_DATABASE_READ_URLS", "").split(",") if u.strip()
+)
+
+# CORS (origines autorisées via env CORS_ORIGINS="http://localhost:3000,https://app.example.com" ou "*")
+_origins_env = os.getenv("CORS_ORIGINS", "*")
+CORS_ORIGINS = ("*",) if _origins_env.strip() == "*" else tuple(o.strip() for o in _origins_env.split(",") if o.strip())
+
+# Métriques Prometheus (GET /metrics), actives par défaut
+METRICS_ENABLED = env_flag("METRICS_ENABLED", "1")
+
+# Chemin rapide (opt-in): FAST_JSON=1 sert les grosses listes (stocks, mouvements)
+# en tuples de colonnes sérialisés directement, sans validation pydantic par objet.
+FAST_JSON = env_flag("FAST_JSON")
+
+# Seuil en millisecondes au-delà duquel une requête SQL est journalisée (0 = désactivé)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# Capture du plan (EXPLAIN / EXPLAIN QUERY PLAN) des requêtes lentes, sur la même connexion
+SLOW_QUERY_EXPLAIN = env_flag("SLOW_QUERY_EXPLAIN")
+
+# Routes /internal (pools, caches, requêtes lentes: SQL et plans bruts): non montées par
+# défaut; si INTERNAL_TOKEN est défini, l'en-tête X-Internal-Token doit le porter
+INTERNAL_ENDPOINTS = env_flag("INTERNAL_ENDPOINTS")
+INTERNAL_TOKEN = os.getenv("INTERNAL_TOKEN", "")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Configuration d'une application (`create_app`); valeurs par défaut lues dans l'environnement.
+
+    Les tests et les outils construisent la leur: `Settings(database_url="sqlite:///...")`.
+    """
+
+    database_url: str = DATABASE_URL
+    database_read_urls: Tuple[str, ...] = DATABASE_READ_URLS
+    read_your_writes_seconds: float = READ_YOUR_WRITES_SECONDS
+    async_database_url: str = ASYNC_DATABASE_URL
+    async_database_read_urls: Tuple[str, ...] = ASYNC_DATABASE_READ_URLS
+    db_async: bool = DB_ASYNC
+    pool_size: int = DB_POOL_SIZE
+    max_overflow: int = DB_MAX_OVERFLOW
+    pool_recycle: int = DB_POOL_RECYCLE
+    pool_timeout: float = DB_POOL_TIMEOUT
+    pool_pre_ping: bool = DB_POOL_PRE_PING
+    cors_origins: Tuple[str, ...] = CORS_ORIGINS
+    metrics_enabled: bool = METRICS_ENABLED
+    fast_json: bool = FAST_JSON
+    slow_query_ms: float = SLOW_QUERY_MS
+    slow_query_explain: bool = SLOW_QUERY_EXPLAIN
+    internal_endpoints: bool = INTERNAL_ENDPOINTS
+    internal_token: str = INTERNAL_TOKEN
+
+
+def app_settings(request: Request) -> Settings:
+    """Configuration de l'application qui sert la requête (posée sur `app.state` par create_app).
+
+    Dépendance FastAPI: deux applications d'un même processus (tests, banc) gardent
+    chacune leurs drapeaux (métriques, FAST_JSON, requêtes lentes, routes internes).
+    """
+    return request.app.state.settings
+
+
+@lru_cache(maxsize=None)
+def default_settings() -> Settings:
+    """Configuration de l'environnement, hors application (scripts, SQL hors requête HTTP)"""
+    return Settings()
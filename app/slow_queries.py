@@ -0,0 +1,161 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+
+from app.metrics import route_label
+from app.settings import default_settings
+
+logger = logging.getLogger(__name__)
+
+# Seuil (SLOW_QUERY_MS) et capture du plan (SLOW_QUERY_EXPLAIN): Settings de l'application
+# qui sert la requête en cours (scope ASGI), sinon ceux de l'environnement.
+# Taille du SQL journalisé et nombre d'entrées gardées pour GET /internal/slow-queries
+SLOW_QUERY_MAX_SQL = 2000
+SLOW_QUERY_HISTORY = int(os.getenv("SLOW_QUERY_HISTORY", "100"))
+
+# Préfixe du plan par dialecte; les autres dialectes ne capturent pas de plan
+_EXPLAIN_PREFIX = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+    "mariadb": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+}
+# EXPLAIN n'exécute pas ces requêtes (pas d'ANALYZE)
+_EXPLAINABLE = ("select", "with", "update", "delete")
+
+_recent = deque(maxlen=SLOW_QUERY_HISTORY)
+_recent_lock = threading.Lock()
+
+# Scope ASGI de la requête en cours, pour le libellé de route (indépendant des métriques)
+_current_scope: ContextVar[Optional[dict]] = ContextVar("fridgey_request_scope", default=None)
+
+
+class RequestContextMiddleware:
+    """Middleware ASGI minimal: rend le scope de la requête visible des hooks SQL"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+def _run_length(type_names: List[str]) -> str:
+    """`int, int, int, str` -> `int*3, str` (listes IN développées lisibles)"""
+    parts = []
+    for name in type_names:
+        if parts and parts[-1][0] == name:
+            parts[-1][1] += 1
+        else:
+            parts.append([name, 1])
+    return ", ".join(name if count == 1 else f"{name}*{count}" for name, count in parts)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Forme des paramètres liés (types, pas les valeurs: pas de données personnelles dans les logs)"""
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {parameter_shape(rows[0]) if rows else '()'}"
+    if isinstance(parameters, Mapping):
+        return "{" + _run_length([type(v).__name__ for v in parameters.values()]) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + _run_length([type(v).__name__ for v in parameters]) + ")"
+    return type(parameters).__name__
+
+
+def _compact_sql(statement: str) -> str:
+    sql = re.sub(r"\s+", " ", statement).strip()
+    return sql if len(sql) <= SLOW_QUERY_MAX_SQL else sql[:SLOW_QUERY_MAX_SQL] + "…"
+
+
+def _explain(conn, statement: str, parameters, context, executemany: bool) -> Optional[List[str]]:
+    """Plan de la requête via un curseur DBAPI brut (pas d'événements, pas de récursion)"""
+    prefix = _EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or executemany or not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        return None
+    # Résultat en flux (yield_per): la connexion est occupée tant que le curseur n'est pas lu
+    if context is not None and context.execution_options.get("stream_results"):
+        return None
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [" | ".join(str(col) for col in row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as e:  # le plan est un bonus: ne jamais faire échouer la requête
+        return [f"EXPLAIN indisponible: {e}"]
+
+
+def recent_slow_queries() -> List[dict]:
+    """Dernières requêtes lentes du worker (plus récente en dernier)"""
+    with _recent_lock:
+        return list(_recent)
+
+
+def clear_slow_queries() -> None:
+    with _recent_lock:
+        _recent.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_start = time.perf_counter()
+
+
+def _scope_settings(scope: Optional[dict]):
+    """Settings de l'application qui sert la requête (`app.state.settings`), sinon de l'environnement"""
+    application = scope.get("app") if scope is not None else None
+    return getattr(getattr(application, "state", None), "settings", None) or default_settings()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    scope = _current_scope.get()
+    settings = _scope_settings(scope)
+    if settings.slow_query_ms <= 0:
+        return
+    duration_ms = (time.perf_counter() - context._slow_query_start) * 1000
+    if duration_ms < settings.slow_query_ms:
+        return
+
+    route = f"{scope['method']} {route_label(scope)}" if scope is not None else None
+    entry = {
+        "duration_ms": round(duration_ms, 3),
+        "route": route,
+        "sql": _compact_sql(statement),
+        "parameters": parameter_shape(parameters, executemany),
+    }
+    if settings.slow_query_explain:
+        entry["plan"] = _explain(conn, statement, parameters, context, executemany)
+    with _recent_lock:
+        _recent.append(entry)
+    logger.warning(
+        "Requête lente %.1f ms [%s] %s | paramètres %s%s",
+        duration_ms,
+        route or "hors requête",
+        entry["sql"],
+        entry["parameters"],
+        "".join(f"\n    {line}" for line in entry.get("plan") or ()),
+        extra={"slow_query": entry},
+    )
+
+
+def install_slow_query_log(target_engine) -> None:
+    """Branche le journal des requêtes lentes sur un engine (sync, ou `.sync_engine` d'un AsyncEngine)"""
+    if not event.contains(target_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target_engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,16 +1,18 @@
+from dataclasses import replace
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.main import app
-from app.database import Base
-from app.routers import users as users_router
-from app.routers import groups as groups_router
-from app.routers import items as items_router
-from app.routers import stocks as stocks_router
-from app.routers import stock_movements as movements_router
+from app.main import create_app
+from app.cache import clear_caches
+from app.database import Base, get_db
+from app.settings import Settings
+
+# Application des TU: aucune URL MySQL, même pour les engines créés à la demande (GET /internal/pool)
+app = create_app(Settings(database_url="sqlite://", internal_endpoints=True))
 
 
 # Engine SQLite en mémoire partagé pour les tests
@@ -26,12 +28,29 @@ from sqlalchemy import event
 
 @event.listens_for(engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
+    # pysqlite gère mal BEGIN/SAVEPOINT: on désactive sa gestion implicite
+    # des transactions et on émet BEGIN nous-mêmes (voir do_begin)
+    dbapi_connection.isolation_level = None
     cursor = dbapi_connection.cursor()
     try:
         cursor.execute("PRAGMA foreign_keys=ON")
     finally:
         cursor.close()
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@event.listens_for(engine, "begin")
+def do_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+# Sessions liées à la connexion du test en cours: leur commit() ne libère
+# qu'un SAVEPOINT, la transaction externe est annulée en fin de test.
+TestingSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    join_transaction_mode="create_savepoint",
+)
 
 
 def override_get_db():
@@ -42,27 +61,77 @@ def override_get_db():
         db.close()
 
 
-# Override des dépendances DB pour tous les routeurs
-app.dependency_overrides[users_router.get_db] = override_get_db
-app.dependency_overrides[groups_router.get_db] = override_get_db
-app.dependency_overrides[items_router.get_db] = override_get_db
-app.dependency_overrides[stocks_router.get_db] = override_get_db
-app.dependency_overrides[movements_router.get_db] = override_get_db
+# Override de la dépendance DB partagée par tous les routeurs
+app.dependency_overrides[get_db] = override_get_db
 
 
-@pytest.fixture(scope="function")
-def client():
-    # Isolation de la base pour chaque test
+@pytest.fixture(scope="session")
+def _schema():
+    """Schéma créé une seule fois pour toute la session de tests"""
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture()
+def db_connection(_schema):
+    """Isolation par test: transaction externe + SAVEPOINT, annulée au teardown.
+
+    Routeurs (`get_db`) et `db_session` partagent cette connexion; les
+    sessions la rejoignent via un SAVEPOINT, leurs commit() n'en sortent pas.
+    """
+    connection = engine.connect()
+    trans = connection.begin()
+    TestingSessionLocal.configure(bind=connection)
+    try:
+        yield connection
+    finally:
+        TestingSessionLocal.configure(bind=engine)
+        trans.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="function")
+def client(db_connection):
+    # Les caches en mémoire survivent aux tests: les vider avec la base
+    clear_caches()
     with TestClient(app) as c:
         yield c
 
 
 @pytest.fixture()
-def db_session():
+def override_settings(monkeypatch):
+    """Modifie la configuration d'une application (celle des TU par défaut) le temps du test"""
+    def override(target=app, **changes):
+        monkeypatch.setattr(target.state, "settings", replace(target.state.settings, **changes))
+    return override
+
+
+@pytest.fixture()
+def db_session(db_connection):
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+_ISOLATION_STATEMENTS = ("BEGIN", "SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@pytest.fixture()
+def query_counter():
+    """Compte les requêtes SQL émises sur l'engine de test."""
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        # BEGIN/SAVEPOINT relèvent de l'isolation des tests, pas du code testé
+        if not statement.startswith(_ISOLATION_STATEMENTS):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
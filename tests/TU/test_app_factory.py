@@ -0,0 +1,96 @@
+import re
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.database import Base
+from app.main import create_app
+from app.settings import Settings
+from tests.bench.startup import BACKEND_DIR
+
+
+def test_importing_app_builds_no_engine():
+    # Interpréteur neuf: l'import ne charge pas le driver MySQL et ne crée aucun engine
+    code = (
+        "import sys, app.main, app.database as d; "
+        "assert 'pymysql' not in sys.modules, 'pymysql'; "
+        "assert d._engine is None and d._SessionLocal is None; "
+        "app.main.app; "
+        "assert 'pymysql' not in sys.modules and d._engine is None"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, check=True)
+
+
+def test_lifespan_creates_and_disposes_engine(tmp_path):
+    url = f"sqlite:///{tmp_path / 'factory.db'}"
+    settings = Settings(
+        database_url=url,
+        metrics_enabled=False,
+        internal_endpoints=True,
+        fast_json=True,
+        slow_query_ms=123,
+    )
+    app = create_app(settings)
+    previous = database.engine_settings()
+    try:
+        with TestClient(app) as client:
+            # Engine créé au démarrage du worker, sur l'URL de la configuration
+            assert database._engine is not None and str(database._engine.url) == url
+            Base.metadata.create_all(bind=database.get_engine())
+            r = client.post("/items/", json={"name": "Farine", "is_food": True, "unit": "g"})
+            assert r.status_code == 200
+            assert client.get(f"/items/{r.json()['id']}").json()["name"] == "Farine"
+            # Drapeaux lus dans la configuration de l'application, pas dans l'environnement
+            assert client.get("/internal/slow-queries").json()["threshold_ms"] == 123
+            # METRICS_ENABLED=0 via la configuration: pas de route /metrics
+            assert client.get("/metrics").status_code == 404
+        # Arrêt: pools fermés, recréés au prochain usage
+        assert database._engine is None
+    finally:
+        database.configure(previous)
+
+
+def test_internal_endpoints_are_opt_in_and_token_protected(tmp_path):
+    url = f"sqlite:///{tmp_path / 'internal.db'}"
+    previous = database.engine_settings()
+    try:
+        with TestClient(create_app(Settings(database_url=url))) as client:
+            assert client.get("/internal/slow-queries").status_code == 404
+
+        settings = Settings(database_url=url, internal_endpoints=True, internal_token="s3cret")
+        with TestClient(create_app(settings)) as client:
+            assert client.get("/internal/cache").status_code == 401
+            assert client.get("/internal/cache", headers={"X-Internal-Token": "faux"}).status_code == 401
+            assert client.get("/internal/cache", headers={"X-Internal-Token": "s3cret"}).status_code == 200
+    finally:
+        database.configure(previous)
+
+
+def test_two_apps_keep_their_own_settings(tmp_path):
+    url = f"sqlite:///{tmp_path / 'two.db'}"
+    previous = database.engine_settings()
+    first = create_app(Settings(database_url=url, internal_endpoints=True, slow_query_ms=111))
+    second = create_app(Settings(database_url=url, internal_endpoints=True, slow_query_ms=222, internal_token="s3cret"))
+    try:
+        with TestClient(first) as a, TestClient(second) as b:
+            # Le démarrage de la seconde ne remplace pas les drapeaux de la première
+            assert a.get("/internal/slow-queries").json()["threshold_ms"] == 111
+            assert b.get("/internal/slow-queries").status_code == 401
+            headers = {"X-Internal-Token": "s3cret"}
+            assert b.get("/internal/slow-queries", headers=headers).json()["threshold_ms"] == 222
+    finally:
+        database.configure(previous)
+
+
+def test_env_example_lists_every_variable():
+    # Chaque variable lue par l'application figure dans .env.example (caches: <PREFIX>_SIZE/_TTL)
+    sources = "\n".join(path.read_text(encoding="utf-8") for path in (BACKEND_DIR / "app").rglob("*.py"))
+    names = set(re.findall(r'(?:getenv|env_flag)\(\s*"([A-Z_]+)"', sources))
+    for prefix in re.findall(r'_cache_from_env\(\s*"([A-Z_]+)"', sources):
+        names |= {f"{prefix}_SIZE", f"{prefix}_TTL"}
+    example = (BACKEND_DIR / ".env.example").read_text(encoding="utf-8")
+    documented = set(re.findall(r"^#?\s*export ([A-Z_]+)=", example, re.MULTILINE))
+    assert "DB_ASYNC" in names and "ITEM_PAGE_CACHE_TTL" in names
+    assert names - documented == set()
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app import archive, balances, models
+
+
+def _stocks_with_history(db, stock_count=3, days=6, start=datetime(2024, 1, 1)):
+    """Crée des stocks avec un mouvement par jour (entrelacés), checkpoints maintenus."""
+    item = models.Item(name="Lait", is_food=True, unit="L")
+    db.add(item)
+    db.flush()
+    stocks = [models.Stock(item_id=item.id, initial_quantity=10, remaining_quantity=10) for _ in range(stock_count)]
+    db.add_all(stocks)
+    db.flush()
+    for day in range(days):
+        for n, stock in enumerate(stocks):
+            change = Decimal(10 if day == 0 else -(n + 1))
+            db.add(models.StockMovement(stock_id=stock.id, change_quantity=change, created_at=start + timedelta(days=day)))
+        db.flush()
+        balances.maintain_checkpoints(db, [s.id for s in stocks])
+    db.commit()
+    return [s.id for s in stocks]
+
+
+def test_archive_is_batched_and_resumable(db_session, client, monkeypatch):
+    monkeypatch.setattr(balances, "CHECKPOINT_INTERVAL", 4)
+    stock_ids = _stocks_with_history(db_session)
+    before = datetime(2024, 1, 4)
+    expected_balances = {sid: balances.balance_at(db_session, sid) for sid in stock_ids}
+    history = {sid: balances.balance_at(db_session, sid, datetime(2024, 1, 2)) for sid in stock_ids}
+
+    # Arrêt après deux lots de 4, puis reprise jusqu'au bout
+    assert archive.archive_movements(db_session, before, batch_size=4, max_batches=2) == 8
+    assert archive.archive_movements(db_session, before, batch_size=4) == 1
+    assert archive.archive_movements(db_session, before, batch_size=4) == 0
+
+    live = db_session.query(models.StockMovement).all()
+    archived = db_session.query(models.StockMovementArchive).all()
+    assert len(live) == 9 and len(archived) == 9
+    assert all(m.created_at >= before for m in live)
+    assert all(m.created_at < before for m in archived)
+
+    # Soldes courants et à date inchangés
+    for sid in stock_ids:
+        assert balances.balance_at(db_session, sid) == expected_balances[sid]
+        assert balances.balance_at(db_session, sid, datetime(2024, 1, 2)) == history[sid]
+
+
+def test_archived_movements_visible_on_request(db_session, client):
+    stock_id = _stocks_with_history(db_session, stock_count=1, days=5)[0]
+    archive.archive_movements(db_session, datetime(2024, 1, 3))
+    first_archived = db_session.query(models.StockMovementArchive).order_by(models.StockMovementArchive.id).first()
+
+    r = client.get(f"/movements/stock/{stock_id}")
+    assert [m["created_at"][:10] for m in r.json()] == ["2024-01-03", "2024-01-04", "2024-01-05"]
+
+    r = client.get(f"/movements/stock/{stock_id}", params={"include_archived": True, "limit": 2})
+    assert [m["created_at"][:10] for m in r.json()] == ["2024-01-01", "2024-01-02"]
+    r = client.get(
+        f"/movements/stock/{stock_id}",
+        params={"include_archived": True, "cursor": r.headers["X-Next-Cursor"]},
+    )
+    assert [m["created_at"][:10] for m in r.json()] == ["2024-01-03", "2024-01-04", "2024-01-05"]
+
+    assert client.get(f"/movements/{first_archived.id}").status_code == 404
+    r = client.get(f"/movements/{first_archived.id}", params={"include_archived": True})
+    assert r.status_code == 200
+    assert r.json()["change_quantity"] == 10.0
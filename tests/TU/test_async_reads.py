@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.routing import Match
+
+from app import models
+from app.cache import clear_caches
+from app.database import Base, get_async_db
+from app.routers import async_reads
+from app.settings import Settings
+
+
+@pytest.fixture()
+def async_client(tmp_path):
+    """App de lecture async sur un fichier SQLite (aiosqlite), amorcé en sync."""
+    db_file = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=sync_engine)
+    with sessionmaker(bind=sync_engine)() as db:
+        user = models.User(name="Alice", email="alice@example.com")
+        group = models.Group(name="Famille")
+        item = models.Item(name="Lait", is_food=True, unit="L")
+        db.add_all([user, group, item])
+        db.flush()
+        db.add(models.UserGroup(user_id=user.id, group_id=group.id, role="admin"))
+        stock = models.Stock(
+            item_id=item.id,
+            group_id=group.id,
+            initial_quantity=Decimal("2"),
+            remaining_quantity=Decimal("2"),
+        )
+        db.add(stock)
+        db.flush()
+        db.add(
+            models.StockMovement(
+                stock_id=stock.id,
+                change_quantity=Decimal("2"),
+                note="Stock initial créé",
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+        db.commit()
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+    AsyncTestingSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    # Caches du catalogue partagés avec les routes sync: repartir à vide
+    clear_caches()
+    app = FastAPI()
+    app.state.settings = Settings(database_url=f"sqlite:///{db_file}")
+    app.include_router(async_reads.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as c:
+        yield c
+    asyncio.run(async_engine.dispose())
+
+
+def test_async_reads_serve_all_resources(async_client):
+    r_users = async_client.get("/users/")
+    assert r_users.status_code == 200
+    assert r_users.json()[0]["groups"][0]["group"]["name"] == "Famille"
+
+    assert async_client.get("/groups/1/users").json()[0]["email"] == "alice@example.com"
+    assert async_client.get("/items/1").json()["name"] == "Lait"
+    assert [s["id"] for s in async_client.get("/stocks/", params={"group_id": 1}).json()] == [1]
+    assert async_client.get("/stocks/", params={"user_id": 1}).json() == []
+    assert float(async_client.get("/stocks/1").json()["remaining_quantity"]) == 2.0
+    assert len(async_client.get("/movements/stock/1").json()) == 1
+    assert async_client.get("/movements/1").json()["note"] == "Stock initial créé"
+
+    for path in ("/users/99", "/groups/99", "/groups/99/users", "/items/99", "/stocks/99", "/movements/99", "/movements/stock/99"):
+        assert async_client.get(path).status_code == 404, path
+
+
+def test_async_reads_include_archived_source(async_client):
+    r = async_client.get("/movements/stock/1", params={"include_archived": True})
+    assert [m["note"] for m in r.json()] == ["Stock initial créé"]
+    assert async_client.get("/movements/1", params={"include_archived": True}).status_code == 200
+    assert async_client.get("/movements/99", params={"include_archived": True}).status_code == 404
+
+
+def test_async_reads_pagination_matches_sync(async_client):
+    r = async_client.get("/groups/", params={"limit": 1})
+    assert r.status_code == 200
+    assert len(r.json()) == 1
+    assert "X-Next-Cursor" not in r.headers
+
+
+def test_async_int_routes_leave_named_sync_routes_reachable():
+    # `{id:int}` ne capture pas /stocks/export, /stocks/expiring ni /movements/export
+    for path in ("/stocks/export", "/stocks/expiring", "/movements/export"):
+        scope = {"type": "http", "path": path, "method": "GET"}
+        assert all(r.matches(scope)[0] == Match.NONE for r in async_reads.router.routes), path
+
+
+def test_async_items_list_uses_page_cache_and_etag(async_client):
+    from app.cache import item_page_cache
+
+    r = async_client.get("/items/")
+    assert [i["name"] for i in r.json()] == ["Lait"]
+    assert item_page_cache.stats()["size"] == 1
+    etag = r.headers["ETag"]
+    assert async_client.get("/items/", headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.parametrize("path", ["/stocks/", "/movements/"])
+def test_async_fast_json_matches_pydantic_path(async_client, override_settings, path):
+    override_settings(async_client.app, fast_json=False)
+    slow = async_client.get(path)
+    override_settings(async_client.app, fast_json=True)
+    fast = async_client.get(path)
+    assert fast.status_code == slow.status_code == 200
+    assert fast.json() == slow.json()
+    assert fast.headers.get("ETag") == slow.headers.get("ETag")
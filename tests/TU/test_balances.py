@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app import balances, models
+
+
+def _stock_with_history(db, changes, start=datetime(2024, 1, 1)):
+    """Crée un stock et ses mouvements datés (un par jour), checkpoints maintenus à chaque écriture."""
+    item = models.Item(name="Riz", is_food=True, unit="kg")
+    db.add(item)
+    db.flush()
+    stock = models.Stock(item_id=item.id, initial_quantity=Decimal(changes[0]), remaining_quantity=Decimal(sum(changes)))
+    db.add(stock)
+    db.flush()
+    for day, change in enumerate(changes):
+        db.add(models.StockMovement(stock_id=stock.id, change_quantity=Decimal(change), created_at=start + timedelta(days=day)))
+        db.flush()
+        balances.maintain_checkpoints(db, [stock.id])
+    db.commit()
+    return stock.id
+
+
+def test_checkpoints_are_written_every_interval(db_session, client, monkeypatch):
+    monkeypatch.setattr(balances, "CHECKPOINT_INTERVAL", 3)
+    stock_id = _stock_with_history(db_session, [10, -1, -2, 5, -1, -1, -3, 2])
+
+    checkpoints = (
+        db_session.query(models.StockBalanceCheckpoint)
+        .filter_by(stock_id=stock_id)
+        .order_by(models.StockBalanceCheckpoint.movement_id)
+        .all()
+    )
+    assert [float(c.balance) for c in checkpoints] == [7.0, 10.0]
+    assert [c.created_at for c in checkpoints] == [datetime(2024, 1, 3), datetime(2024, 1, 6)]
+
+
+def test_balance_at_matches_full_replay(db_session, client, monkeypatch):
+    monkeypatch.setattr(balances, "CHECKPOINT_INTERVAL", 3)
+    changes = [10, -1, -2, 5, -1, -1, -3, 2]
+    stock_id = _stock_with_history(db_session, changes)
+
+    assert balances.balance_at(db_session, stock_id, datetime(2023, 12, 31)) == 0
+    for day in range(len(changes)):
+        at = datetime(2024, 1, 1) + timedelta(days=day, hours=12)
+        assert balances.balance_at(db_session, stock_id, at) == sum(changes[: day + 1])
+    assert balances.balance_at(db_session, stock_id) == sum(changes)
+    assert balances.balance_at(db_session, 9999) is None
+
+
+def test_balance_endpoint_follows_api_writes(client, monkeypatch):
+    monkeypatch.setattr(balances, "CHECKPOINT_INTERVAL", 2)
+    item_id = client.post("/items/", json={"name": "Farine", "is_food": True, "unit": "kg"}).json()["id"]
+    stock = client.post(
+        "/stocks/",
+        json={"item_id": item_id, "initial_quantity": 4.0, "remaining_quantity": 4.0},
+    ).json()
+    for change in (-1, -1, 3):
+        assert client.put(f"/stocks/{stock['id']}", params={"change": change}).status_code == 200
+    assert client.put("/stocks/batch", json=[{"stock_id": stock["id"], "change": -2}]).status_code == 200
+
+    r = client.get(f"/stocks/{stock['id']}/balance")
+    assert r.status_code == 200
+    assert r.json()["balance"] == 3.0
+
+    r_past = client.get(f"/stocks/{stock['id']}/balance", params={"at": "2000-01-01T00:00:00"})
+    assert r_past.json()["balance"] == 0.0
+
+    assert client.get("/stocks/9999/balance").status_code == 404
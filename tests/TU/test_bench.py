@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app import models
+from app.database import get_db
+from tests.bench.runner import percentile, summarize
+from tests.bench.seed import bench_engine, seed
+from tests.bench.server import build_app
+
+
+def test_bench_seed_is_consistent(tmp_path):
+    engine = bench_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    volumes = {"users": 10, "groups": 3, "items": 5, "stocks": 40, "movements": 200}
+    dataset = seed(engine, volumes)
+    assert dataset["movements"] == 200 and dataset["stocks"] == 40
+
+    with engine.connect() as conn:
+        # Quantité restante = somme des mouvements, jamais négative
+        balances = dict(conn.execute(
+            select(models.StockMovement.stock_id, func.sum(models.StockMovement.change_quantity))
+            .group_by(models.StockMovement.stock_id)
+        ).all())
+        for stock_id, remaining in conn.execute(select(models.Stock.id, models.Stock.remaining_quantity)):
+            assert Decimal(str(balances[stock_id])) == remaining >= 0
+        assert conn.execute(select(func.count()).select_from(models.User)).scalar_one() == 10
+    engine.dispose()
+
+
+def test_bench_percentiles_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    stats = summarize(values, errors=1, wall_time=2.0)
+    assert stats["requests"] == 100
+    assert stats["throughput_rps"] == 50.0
+    assert (stats["p50_ms"], stats["p95_ms"], stats["p99_ms"]) == (50.0, 95.0, 99.0)
+
+
+def test_bench_server_app_is_built_on_the_bench_database(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'bench.db'}"
+    seed(bench_engine(database_url), {"users": 3, "groups": 1, "items": 2, "stocks": 4, "movements": 8})
+
+    app = build_app(database_url)
+    settings = app.state.settings
+    assert settings.database_url == database_url
+    assert (settings.database_read_urls, settings.db_async) == ((), False)
+    assert get_db in app.dependency_overrides
+
+    with TestClient(app) as client:
+        response = client.get("/items/")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
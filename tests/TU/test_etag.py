@@ -0,0 +1,131 @@
+from sqlalchemy import select, update
+
+from app import models
+
+
+def _item(client, name="Lait"):
+    return client.post("/items/", json={"name": name, "is_food": True, "unit": "L"}).json()["id"]
+
+
+def _stock(client, item_id, qty=3.0, **extra):
+    payload = {"item_id": item_id, "initial_quantity": qty, "remaining_quantity": qty}
+    payload.update(extra)
+    return client.post("/stocks/", json=payload).json()["id"]
+
+
+def test_stocks_list_conditional_get(client, query_counter):
+    item_id = _item(client)
+    sid = _stock(client, item_id)
+
+    # Sans If-None-Match: ETag calculé sur la page lue, aucune requête de plus
+    query_counter.clear()
+    r = client.get("/stocks/")
+    assert r.status_code == 200
+    assert len(query_counter) == 1
+    etag = r.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    # Poll inchangé: 304, une seule requête (lignes de version), pas de corps
+    query_counter.clear()
+    r_304 = client.get("/stocks/", headers={"If-None-Match": etag})
+    assert r_304.status_code == 304
+    assert r_304.headers["ETag"] == etag
+    assert r_304.content == b""
+    assert len(query_counter) == 1
+
+    # Liste d'ETags / comparaison faible
+    assert client.get("/stocks/", headers={"If-None-Match": f'"autre", {etag[2:]}'}).status_code == 304
+
+    # Variation de quantité (même seconde): nouvelle version
+    client.put(f"/stocks/{sid}", params={"change": -1})
+    r2 = client.get("/stocks/", headers={"If-None-Match": etag})
+    assert r2.status_code == 200
+    assert r2.headers["ETag"] != etag
+
+    # Filtres et pagination ont leur propre empreinte
+    _stock(client, item_id)
+    r_page = client.get("/stocks/", params={"limit": 1})
+    assert r_page.headers["ETag"] != r2.headers["ETag"]
+
+
+def test_stocks_list_etag_sees_same_second_transfer(client, db_session):
+    item_id = _item(client)
+    a, b = _stock(client, item_id, qty=5.0), _stock(client, item_id, qty=5.0)
+    etag = client.get("/stocks/").headers["ETag"]
+    stamps = dict(db_session.execute(select(models.Stock.id, models.Stock.updated_at)).all())
+
+    r = client.put("/stocks/batch", json=[{"stock_id": a, "change": -2}, {"stock_id": b, "change": 2}])
+    assert r.status_code == 200
+    # Même seconde qu'avant le transfert: updated_at inchangés, somme des quantités aussi
+    for stock_id, stamp in stamps.items():
+        db_session.execute(update(models.Stock).where(models.Stock.id == stock_id).values(updated_at=stamp))
+    db_session.commit()
+
+    r = client.get("/stocks/", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+
+
+def test_stock_and_item_conditional_get(client):
+    item_id = _item(client)
+    sid = _stock(client, item_id)
+
+    etag = client.get(f"/stocks/{sid}").headers["ETag"]
+    assert client.get(f"/stocks/{sid}", headers={"If-None-Match": etag}).status_code == 304
+    client.put(f"/stocks/{sid}", params={"change": 1})
+    assert client.get(f"/stocks/{sid}", headers={"If-None-Match": etag}).status_code == 200
+
+    item_etag = client.get(f"/items/{item_id}").headers["ETag"]
+    assert client.get(f"/items/{item_id}", headers={"If-None-Match": item_etag}).status_code == 304
+
+    list_etag = client.get("/items/").headers["ETag"]
+    assert client.get("/items/", headers={"If-None-Match": list_etag}).status_code == 304
+    _item(client, "Beurre")
+    assert client.get("/items/", headers={"If-None-Match": list_etag}).status_code == 200
+
+
+def test_group_users_conditional_get(client):
+    gid = client.post("/groups/", json={"name": "Coloc"}).json()["id"]
+    other = client.post("/groups/", json={"name": "Club"}).json()["id"]
+    uid = client.post("/users/", json={"name": "Ana", "email": "ana@example.com"}).json()["id"]
+    client.post("/groups/add_user", json={"user_id": uid, "group_id": gid, "role": "admin"})
+
+    etag = client.get(f"/groups/{gid}/users").headers["ETag"]
+    assert client.get(f"/groups/{gid}/users", headers={"If-None-Match": etag}).status_code == 304
+
+    # Une appartenance du membre à un autre groupe change le corps sérialisé
+    client.post("/groups/add_user", json={"user_id": uid, "group_id": other, "role": "member"})
+    r = client.get(f"/groups/{gid}/users", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert len(r.json()[0]["groups"]) == 2
+
+    assert client.get("/groups/9999/users", headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_group_users_etag_tracks_roles_and_swaps(client):
+    gid = client.post("/groups/", json={"name": "Atelier"}).json()["id"]
+    g2 = client.post("/groups/", json={"name": "Chorale"}).json()["id"]
+    g3 = client.post("/groups/", json={"name": "Jardin"}).json()["id"]
+    u1 = client.post("/users/", json={"name": "Léa", "email": "lea@example.com"}).json()["id"]
+    u2 = client.post("/users/", json={"name": "Max", "email": "max@example.com"}).json()["id"]
+    client.post("/groups/add_user", json={"user_id": u1, "group_id": gid, "role": "member"})
+    etag = client.get(f"/groups/{gid}/users").headers["ETag"]
+
+    # Même appartenance, autre rôle: mêmes count/sommes, corps différent
+    assert client.delete(f"/groups/{gid}/users/{u1}").status_code == 200
+    client.post("/groups/add_user", json={"user_id": u1, "group_id": gid, "role": "admin"})
+    r = client.get(f"/groups/{gid}/users", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()[0]["groups"][0]["role"] == "admin"
+    assert r.headers["ETag"] != etag
+
+    # Deux membres échangent leurs autres groupes: les sommes d'IDs se compensent
+    client.post("/groups/add_user", json={"user_id": u2, "group_id": gid, "role": "admin"})
+    client.post("/groups/add_user", json={"user_id": u1, "group_id": g2, "role": "member"})
+    client.post("/groups/add_user", json={"user_id": u2, "group_id": g3, "role": "member"})
+    etag = client.get(f"/groups/{gid}/users").headers["ETag"]
+    client.delete(f"/groups/{g2}/users/{u1}")
+    client.delete(f"/groups/{g3}/users/{u2}")
+    client.post("/groups/add_user", json={"user_id": u1, "group_id": g3, "role": "member"})
+    client.post("/groups/add_user", json={"user_id": u2, "group_id": g2, "role": "member"})
+    assert client.get(f"/groups/{gid}/users", headers={"If-None-Match": etag}).status_code == 200
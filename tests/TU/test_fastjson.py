@@ -0,0 +1,87 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import Response
+
+from app import fastjson
+
+
+def _create_stocks(client, count=5):
+    r = client.post("/items/", json={"name": "Riz", "is_food": True, "unit": "kg"})
+    assert r.status_code == 200
+    item_id = r.json()["id"]
+    payload = [
+        {
+            "item_id": item_id,
+            "expiration_date": "2030-01-0%d" % (i + 1),
+            "initial_quantity": 2.5 + i,
+            "remaining_quantity": 2.5 + i,
+            "lot_count": 1,
+        }
+        for i in range(count)
+    ]
+    r = client.post("/stocks/bulk", json=payload)
+    assert r.status_code == 200
+
+
+@pytest.fixture
+def fast_json(override_settings):
+    def enable(enabled=True):
+        override_settings(fast_json=enabled)
+    return enable
+
+
+@pytest.mark.parametrize("path", ["/stocks/", "/movements/"])
+def test_fast_path_matches_pydantic_path(client, fast_json, path):
+    _create_stocks(client)
+
+    fast_json(False)
+    slow = client.get(path, params={"limit": 2})
+    fast_json(True)
+    fast = client.get(path, params={"limit": 2})
+
+    assert fast.status_code == slow.status_code == 200
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.json() == slow.json()
+    assert fast.headers["X-Next-Cursor"] == slow.headers["X-Next-Cursor"]
+    assert fast.headers.get("ETag") == slow.headers.get("ETag")
+
+    # Page suivante et dernière page: même curseur, mêmes lignes
+    cursor = fast.headers["X-Next-Cursor"]
+    fast_json(False)
+    slow_next = client.get(path, params={"limit": 10, "after": cursor})
+    fast_json(True)
+    fast_next = client.get(path, params={"limit": 10, "after": cursor})
+    assert fast_next.json() == slow_next.json()
+    assert "X-Next-Cursor" not in fast_next.headers
+
+
+def test_fast_path_keeps_conditional_get(client, fast_json):
+    _create_stocks(client, count=2)
+    fast_json(True)
+    first = client.get("/stocks/")
+    r = client.get("/stocks/", headers={"If-None-Match": first.headers["ETag"]})
+    assert r.status_code == 304
+
+
+def test_dumps_stdlib_fallback_matches_orjson(monkeypatch):
+    content = [{"q": Decimal("1.50"), "d": date(2030, 1, 2), "t": datetime(2030, 1, 2, 3, 4, 5), "n": None}]
+    fast = fastjson.dumps(content)
+    monkeypatch.setattr(fastjson, "orjson", None)
+    assert json.loads(fastjson.dumps(content)) == json.loads(fast)
+    assert json.loads(fast) == [{"q": 1.5, "d": "2030-01-02", "t": "2030-01-02T03:04:05", "n": None}]
+
+
+def test_fast_json_response_keeps_repeated_headers():
+    response = Response()
+    response.headers["ETag"] = '"abc"'
+    response.set_cookie("a", "1")
+    response.set_cookie("b", "2")
+
+    fast = fastjson.fast_json_response([{"id": 1}], response)
+    cookies = [value for key, value in fast.raw_headers if key == b"set-cookie"]
+    assert [c.split(b";")[0] for c in cookies] == [b"a=1", b"b=2"]
+    assert fast.headers["etag"] == '"abc"'
+    assert fast.headers["content-length"] == str(len(fast.body))
@@ -92,3 +92,103 @@ def test_group_delete_with_existing_link_returns_400(client):
     # Attempt to delete the group while link exists -> 409 explicite
     r_del = client.delete(f"/groups/{gid}")
     assert r_del.status_code == 409
+
+
+def test_group_inventory_is_aggregated_and_invalidated(client, query_counter):
+    gid = client.post("/groups/", json={"name": "Maison"}).json()["id"]
+    lait = client.post("/items/", json={"name": "Lait", "is_food": True, "unit": "L"}).json()["id"]
+    pates = client.post("/items/", json={"name": "Pâtes", "is_food": True, "unit": "kg"}).json()["id"]
+
+    def stock(item_id, qty, group_id=gid):
+        r = client.post(
+            "/stocks/",
+            json={"item_id": item_id, "group_id": group_id, "initial_quantity": qty, "remaining_quantity": qty},
+        )
+        assert r.status_code == 200
+        return r.json()["id"]
+
+    s1 = stock(lait, 2)
+    stock(lait, 1.5)
+    stock(pates, 1)
+    stock(pates, 7, group_id=None)  # hors groupe
+
+    r = client.get(f"/groups/{gid}/inventory")
+    assert r.status_code == 200
+    assert r.json() == [
+        {"item_id": lait, "item_name": "Lait", "unit": "L", "total_remaining": 3.5, "stock_count": 2},
+        {"item_id": pates, "item_name": "Pâtes", "unit": "kg", "total_remaining": 1.0, "stock_count": 1},
+    ]
+
+    # Deuxième lecture servie par le cache: aucune requête SQL
+    query_counter.clear()
+    assert client.get(f"/groups/{gid}/inventory").json() == r.json()
+    assert query_counter == []
+
+    # Chaque écriture sur un stock du groupe invalide l'entrée
+    client.put(f"/stocks/{s1}", params={"change": -1})
+    assert client.get(f"/groups/{gid}/inventory").json()[0]["total_remaining"] == 2.5
+    client.put("/stocks/batch", json=[{"stock_id": s1, "change": -1}])
+    assert client.get(f"/groups/{gid}/inventory").json()[0]["total_remaining"] == 1.5
+    client.delete(f"/stocks/{s1}")
+    assert client.get(f"/groups/{gid}/inventory").json()[0]["stock_count"] == 1
+    stock(pates, 2)
+    assert client.get(f"/groups/{gid}/inventory").json()[1]["total_remaining"] == 3.0
+    client.post("/stocks/bulk", json=[{"item_id": pates, "group_id": gid, "initial_quantity": 1, "remaining_quantity": 1}])
+    assert client.get(f"/groups/{gid}/inventory").json()[1]["total_remaining"] == 4.0
+
+    assert client.get("/groups/9999/inventory").status_code == 404
+
+
+def test_groups_bulk_delete_reports_blockers(client):
+    empty = client.post("/groups/", json={"name": "Vide"}).json()["id"]
+    linked = client.post("/groups/", json={"name": "Lié"}).json()["id"]
+    user_id = client.post("/users/", json={"name": "Bob", "email": "bob.bulk@example.com"}).json()["id"]
+    client.post("/groups/add_user", json={"user_id": user_id, "group_id": linked, "role": "member"})
+    item_id = client.post("/items/", json={"name": "Riz", "is_food": True, "unit": "g"}).json()["id"]
+    client.post("/stocks/", json={"item_id": item_id, "group_id": linked, "initial_quantity": 1, "remaining_quantity": 1})
+
+    r = client.request("DELETE", "/groups/bulk", json=[empty, linked, 424242])
+    assert r.status_code == 200
+    assert r.json() == [
+        {"id": empty, "status_code": 200, "detail": f"Groupe {empty} supprimé"},
+        {
+            "id": linked,
+            "status_code": 409,
+            "detail": "Suppression interdite: le groupe possède des utilisateurs liés et des stocks associés",
+        },
+        {"id": 424242, "status_code": 404, "detail": "Groupe introuvable"},
+    ]
+    assert client.get(f"/groups/{empty}").status_code == 404
+    assert client.get(f"/groups/{linked}").status_code == 200
+
+
+def test_delete_group_invalidates_inventory_cache(client):
+    group_id = client.post("/groups/", json={"name": "Éphémère"}).json()["id"]
+    assert client.get(f"/groups/{group_id}/inventory").json() == []
+
+    assert client.delete(f"/groups/{group_id}").status_code == 200
+    assert client.get(f"/groups/{group_id}/inventory").status_code == 404
+
+
+def test_group_inventory_read_racing_a_write_is_not_cached(client):
+    from sqlalchemy import event
+
+    from app.cache import group_inventory_cache
+    from tests.TU.conftest import engine
+
+    gid = client.post("/groups/", json={"name": "Course"}).json()["id"]
+
+    # Une écriture (invalidation) survient pendant la lecture de l'agrégat
+    def invalidate_during_read(conn, cursor, statement, *args):
+        if "sum(stocks.remaining_quantity)" in statement:
+            group_inventory_cache.invalidate([gid])
+
+    event.listen(engine, "before_cursor_execute", invalidate_during_read)
+    try:
+        assert client.get(f"/groups/{gid}/inventory").json() == []
+    finally:
+        event.remove(engine, "before_cursor_execute", invalidate_during_read)
+    # Résultat potentiellement périmé: pas mis en cache
+    assert group_inventory_cache.get(gid) is None
+    assert client.get(f"/groups/{gid}/inventory").json() == []
+    assert group_inventory_cache.get(gid) == []
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.database import InstrumentedQueuePool, pool_stats
+
+
+def test_pool_endpoint_reports_sync_pool(client):
+    r = client.get("/internal/pool")
+    assert r.status_code == 200
+    sync = r.json()["sync"]
+    assert sync["pool_class"] == "InstrumentedQueuePool"
+    for key in ("size", "checked_out", "overflow", "max_overflow", "checkouts", "wait_time_max", "timeouts"):
+        assert key in sync
+
+
+def test_instrumented_pool_counts_checkouts_overflow_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    c1 = engine.connect()
+    c2 = engine.connect()
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    stats = pool_stats(engine)
+    assert stats["timeouts"] == 1
+    # Tentative expirée: ni checkout ni attente comptés dans les moyennes
+    assert stats["checkouts"] == 2
+    assert stats["wait_time_max"] < 0.05
+
+    c1.close()
+    c2.close()
+    engine.dispose()
+    assert isinstance(engine.pool, InstrumentedQueuePool)
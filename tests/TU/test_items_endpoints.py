@@ -29,3 +29,118 @@ def test_items_crud_flow(client):
     r_get2 = client.get(f"/items/{item_id}")
     assert r_get2.status_code == 404
 
+
+
+def test_items_keyset_pagination(client):
+    created = []
+    for i in range(5):
+        ri = client.post("/items/", json={"name": f"Produit {i}", "is_food": True, "unit": "u"})
+        assert ri.status_code == 200
+        created.append(ri.json()["id"])
+
+    # Parcours complet par pages de 2 en suivant X-Next-Cursor
+    seen = []
+    params = {"limit": 2}
+    while True:
+        r = client.get("/items/", params=params)
+        assert r.status_code == 200
+        assert len(r.json()) <= 2
+        seen.extend(i["id"] for i in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"limit": 2, "after": cursor}
+    assert seen == created
+
+    # Dernière page exacte: pas de curseur suivant
+    r_all = client.get("/items/", params={"limit": 5})
+    assert len(r_all.json()) == 5
+    assert "X-Next-Cursor" not in r_all.headers
+
+    # Plafond dur de la taille de page
+    r_big = client.get("/items/", params={"limit": 100000})
+    assert r_big.status_code == 422
+
+    # Curseur illisible
+    r_bad = client.get("/items/", params={"after": "pas-un-curseur"})
+    assert r_bad.status_code == 400
+
+
+def test_item_cache_write_through_and_counters(client, query_counter):
+    from app.cache import item_cache
+
+    item_id = client.post("/items/", json={"name": "Sel", "is_food": True, "unit": "g"}).json()["id"]
+
+    # Fiche servie par le cache dès la création (write-through), sans requête SQL
+    query_counter.clear()
+    assert client.get(f"/items/{item_id}").json()["name"] == "Sel"
+    assert query_counter == []
+
+    # Pages de liste en cache, invalidées par create/delete: seule la sonde (count, max) est lue
+    assert [i["id"] for i in client.get("/items/").json()] == [item_id]
+    query_counter.clear()
+    assert [i["id"] for i in client.get("/items/").json()] == [item_id]
+    assert len(query_counter) == 1 and "count(items.id)" in query_counter[0]
+    other = client.post("/items/", json={"name": "Poivre", "is_food": True, "unit": "g"}).json()["id"]
+    assert [i["id"] for i in client.get("/items/").json()] == [item_id, other]
+
+    assert client.delete(f"/items/{item_id}").status_code == 200
+    assert client.get(f"/items/{item_id}").status_code == 404
+    assert [i["id"] for i in client.get("/items/").json()] == [other]
+
+    stats = client.get("/internal/cache").json()["items"]
+    assert stats["hits"] >= 1 and stats["misses"] >= 1
+    assert stats["size"] == item_cache.stats()["size"]
+
+
+def test_lru_cache_eviction_and_ttl(monkeypatch):
+    from app import cache
+
+    lru = cache.LRUCache(maxsize=2, ttl=10)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1  # "a" devient le plus récent
+    lru.set("c", 3)  # évince "b"
+    assert lru.get("b") is None
+    assert lru.stats()["evictions"] == 1
+
+    now = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + 11)
+    assert lru.get("a") is None
+    assert lru.stats()["size"] == 1
+
+
+def test_items_bulk_delete_invalidates_cache(client):
+    free = client.post("/items/", json={"name": "Thé", "is_food": True, "unit": "g"}).json()["id"]
+    stocked = client.post("/items/", json={"name": "Café", "is_food": True, "unit": "g"}).json()["id"]
+    client.post("/stocks/", json={"item_id": stocked, "initial_quantity": 1, "remaining_quantity": 1})
+    assert {i["id"] for i in client.get("/items/").json()} == {free, stocked}
+
+    r = client.request("DELETE", "/items/bulk", json=[free, stocked])
+    assert [line["status_code"] for line in r.json()] == [200, 409]
+    assert r.json()[1]["detail"] == "Suppression interdite: le produit possède des stocks associés"
+
+    # Fiche et pages de liste invalidées
+    assert client.get(f"/items/{free}").status_code == 404
+    assert [i["id"] for i in client.get("/items/").json()] == [stocked]
+
+
+def test_item_cache_is_not_trusted_for_other_workers_writes(client, db_session):
+    from app import models
+
+    kept = client.post("/items/", json={"name": "Thé", "is_food": True, "unit": "g"}).json()["id"]
+    gone = client.post("/items/", json={"name": "Café", "is_food": True, "unit": "g"}).json()["id"]
+    assert [i["id"] for i in client.get("/items/").json()] == [kept, gone]
+
+    # Écritures d'un autre worker: directement en base, sans toucher aux caches de celui-ci
+    db_session.add(models.Item(name="Cacao", is_food=True, unit="g"))
+    db_session.flush()
+    db_session.query(models.Item).filter(models.Item.id == gone).delete()
+    db_session.commit()
+
+    # Existence vérifiée en base: 404, pas une erreur de clé étrangère
+    payload = {"item_id": gone, "initial_quantity": 1, "remaining_quantity": 1}
+    assert client.post("/stocks/", json=payload).status_code == 404
+    assert client.post("/stocks/bulk", json=[payload]).status_code == 404
+    # La sonde (count, max(id)) change: la page est relue
+    assert [i["name"] for i in client.get("/items/").json()] == ["Thé", "Cacao"]
@@ -0,0 +1,53 @@
+import pytest
+
+from app import metrics
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics():
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+def test_metrics_record_route_latency_status_and_db_statements(client):
+    r = client.post("/items/", json={"name": "Pâtes", "is_food": True, "unit": "g"})
+    assert r.status_code == 200
+    assert client.get("/stocks/1").status_code == 404
+    assert client.get("/stocks/2").status_code == 404
+    assert client.get("/nope").status_code == 404
+
+    # Gabarit de route (et non chemin brut), statut et requêtes SQL par requête
+    assert metrics.http_requests.value(("GET", "/stocks/{stock_id}", "404")) == 2
+    assert metrics.http_requests.value(("POST", "/items/", "200")) == 1
+    assert metrics.http_requests.value(("GET", metrics.UNMATCHED_ROUTE, "404")) == 1
+    assert metrics.http_latency.count(("GET", "/stocks/{stock_id}")) == 2
+    assert metrics.db_statements.value(("GET", "/stocks/{stock_id}")) >= 2
+    assert metrics.db_statements.value(("GET", metrics.UNMATCHED_ROUTE)) == 0
+    assert metrics.db_time.value(("POST", "/items/")) > 0
+
+
+def test_metrics_endpoint_prometheus_format(client):
+    client.get("/items/")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = r.text
+    assert "# TYPE fridgey_http_request_duration_seconds histogram" in body
+    assert 'fridgey_http_requests_total{method="GET",route="/items/",status="200"} 1' in body
+    assert 'fridgey_http_request_duration_seconds_bucket{method="GET",route="/items/",le="+Inf"} 1' in body
+    assert 'fridgey_http_request_duration_seconds_count{method="GET",route="/items/"} 1' in body
+    assert 'fridgey_db_statements_per_request_bucket{method="GET",route="/items/",le="1"}' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("h", "doc", ("route",), buckets=(1, 5))
+    for value in (0.5, 1, 3, 7):
+        histogram.observe(("/x",), value)
+    assert list(histogram.samples()) == [
+        'h_bucket{route="/x",le="1"} 2',
+        'h_bucket{route="/x",le="5"} 3',
+        'h_bucket{route="/x",le="+Inf"} 4',
+        'h_sum{route="/x"} 11.5',
+        'h_count{route="/x"} 4',
+    ]
@@ -51,3 +51,75 @@ def test_movements_listing_and_get(client):
     # Not found
     r_nf = client.get("/movements/9999")
     assert r_nf.status_code == 404
+
+
+def test_movements_export_ndjson_and_csv(client):
+    import json
+
+    stock_id = _create_stock_and_move(client)
+
+    r_nd = client.get("/movements/export")
+    assert r_nd.status_code == 200
+    assert r_nd.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r_nd.text.splitlines()]
+    assert len(rows) == 2
+    assert all(row["stock_id"] == stock_id for row in rows)
+    assert [row["change_quantity"] for row in rows] == [5.0, -2.0]
+
+    r_csv = client.get("/movements/export", params={"format": "csv"})
+    assert r_csv.status_code == 200
+    lines = r_csv.text.splitlines()
+    assert lines[0] == "id,stock_id,change_quantity,note,created_at"
+    assert len(lines) == 3
+
+    r_bad = client.get("/movements/export", params={"format": "xml"})
+    assert r_bad.status_code == 422
+
+
+def test_movements_for_stock_time_range_and_cursor(client, db_session):
+    from datetime import datetime
+    from app import models
+
+    stock_id = _create_stock_and_move(client)
+    for change in (-1, -1):
+        assert client.put(f"/stocks/{stock_id}", params={"change": change}).status_code == 200
+
+    # Dater explicitement les mouvements pour tester les bornes
+    movs = (
+        db_session.query(models.StockMovement)
+        .filter(models.StockMovement.stock_id == stock_id)
+        .order_by(models.StockMovement.id)
+        .all()
+    )
+    dates = [datetime(2024, 1, 1), datetime(2024, 2, 1), datetime(2024, 2, 1), datetime(2024, 3, 1)]
+    for mov, created_at in zip(movs, dates):
+        mov.created_at = created_at
+    db_session.commit()
+    expected = [m.id for m in movs]
+
+    # Pagination stable (created_at, id), y compris sur des dates égales
+    seen = []
+    params = {"limit": 1}
+    while True:
+        r = client.get(f"/movements/stock/{stock_id}", params=params)
+        assert r.status_code == 200
+        seen.extend(m["id"] for m in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"limit": 1, "cursor": cursor}
+    assert seen == expected
+
+    r_range = client.get(
+        f"/movements/stock/{stock_id}",
+        params={"since": "2024-02-01T00:00:00", "until": "2024-03-01T00:00:00"},
+    )
+    assert [m["id"] for m in r_range.json()] == expected[1:3]
+
+    # Stock existant sans mouvement dans la plage -> liste vide, pas 404
+    r_empty = client.get(f"/movements/stock/{stock_id}", params={"since": "2030-01-01T00:00:00"})
+    assert r_empty.status_code == 200
+    assert r_empty.json() == []
+
+    assert client.get("/movements/stock/9999").status_code == 404
+    assert client.get(f"/movements/stock/{stock_id}", params={"cursor": "xx"}).status_code == 400
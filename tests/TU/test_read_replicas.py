@@ -0,0 +1,143 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import database, models
+from app.database import READ_YOUR_WRITES_COOKIE, Base
+from app.main import create_app
+from app.settings import Settings
+
+
+def _sqlite_file(tmp_path, name, user_name=None):
+    """Base SQLite fichier avec le schéma, et un utilisateur d'ID 1 (pour reconnaître le réplica)"""
+    url = f"sqlite:///{tmp_path / name}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    if user_name:
+        with Session(engine) as db:
+            db.add(models.User(id=1, name=user_name, email=f"{name.split('.')[0]}@example.com"))
+            db.commit()
+    engine.dispose()
+    return url
+
+
+@pytest.fixture()
+def replica_app(tmp_path):
+    """Primaire vide, deux réplicas (non répliqués) qui contiennent chacun un utilisateur 1 différent"""
+    settings = Settings(
+        database_url=_sqlite_file(tmp_path, "primary.db"),
+        database_read_urls=(
+            _sqlite_file(tmp_path, "replica_a.db", "Réplica A"),
+            _sqlite_file(tmp_path, "replica_b.db", "Réplica B"),
+        ),
+        read_your_writes_seconds=60,
+        metrics_enabled=False,
+        internal_endpoints=True,
+    )
+    previous = database.engine_settings()
+    try:
+        yield create_app(settings)
+    finally:
+        database.configure(previous)
+
+
+def test_reads_round_robin_across_replicas(replica_app):
+    with TestClient(replica_app) as client:
+        names = [client.get("/users/1").json()["name"] for _ in range(4)]
+        assert sorted(names) == ["Réplica A", "Réplica A", "Réplica B", "Réplica B"]
+        assert names[0] != names[1]
+
+        pools = client.get("/internal/pool").json()
+        assert len(pools["readers"]) == 2
+
+
+def test_writes_go_to_primary_and_writer_reads_its_writes(replica_app):
+    with TestClient(replica_app) as writer, TestClient(replica_app) as other:
+        r = writer.post("/users/", json={"name": "Alice", "email": "alice.primary@example.com"})
+        assert r.status_code == 200
+        assert READ_YOUR_WRITES_COOKIE in r.cookies
+        user_id = r.json()["id"]
+
+        # Le client qui vient d'écrire relit sur le primaire, les autres sur les réplicas
+        assert [u["name"] for u in writer.get("/users/").json()] == ["Alice"]
+        assert "Alice" not in {u["name"] for u in other.get("/users/").json()}
+        assert writer.get(f"/users/{user_id}").status_code == 200
+
+        # Fenêtre expirée: retour aux réplicas
+        writer.cookies.set(READ_YOUR_WRITES_COOKIE, "0")
+        assert "Alice" not in {u["name"] for u in writer.get("/users/").json()}
+
+
+def test_without_replicas_everything_uses_primary(tmp_path):
+    settings = Settings(
+        database_url=_sqlite_file(tmp_path, "solo.db"),
+        database_read_urls=(),
+        metrics_enabled=False,
+        internal_endpoints=True,
+    )
+    previous = database.engine_settings()
+    try:
+        with TestClient(create_app(settings)) as client:
+            r = client.post("/users/", json={"name": "Solo", "email": "solo@example.com"})
+            assert READ_YOUR_WRITES_COOKIE not in r.cookies
+            assert client.get(f"/users/{r.json()['id']}").json()["name"] == "Solo"
+            assert "readers" not in client.get("/internal/pool").json()
+    finally:
+        database.configure(previous)
+
+
+def test_cached_reads_are_filled_from_primary_only(replica_app):
+    with TestClient(replica_app) as writer, TestClient(replica_app) as other:
+        # Même groupe 1 sur le primaire et les réplicas, qui n'en voient pas les stocks
+        for read_engine in database.read_engines():
+            with Session(read_engine) as db:
+                db.add(models.Group(id=1, name="Foyer"))
+                db.commit()
+        group_id = writer.post("/groups/", json={"name": "Foyer"}).json()["id"]
+        item_id = writer.post("/items/", json={"name": "Riz", "is_food": True, "unit": "g"}).json()["id"]
+        writer.post(
+            "/stocks/",
+            json={"item_id": item_id, "group_id": group_id, "initial_quantity": 2, "remaining_quantity": 2},
+        )
+
+        # Un autre client relit sur un réplica en retard: réponse ancienne, rien en cache
+        assert other.get("/items/").json() == []
+        assert other.get(f"/groups/{group_id}/inventory").json() == []
+
+        # Le client qui a écrit voit son écriture (et remplit les caches depuis le primaire)
+        assert [i["id"] for i in writer.get("/items/").json()] == [item_id]
+        assert writer.get(f"/groups/{group_id}/inventory").json()[0]["total_remaining"] == 2
+        # Pages de produits: la clé suit la sonde (count, max) de la base lue, ici le réplica
+        assert other.get("/items/").json() == []
+
+
+def test_async_reads_use_async_replicas_and_cookie(tmp_path):
+    primary = _sqlite_file(tmp_path, "primary.db")
+    replica = _sqlite_file(tmp_path, "replica.db", "Réplica")
+    settings = Settings(
+        database_url=primary,
+        database_read_urls=(replica,),
+        async_database_url=primary.replace("sqlite://", "sqlite+aiosqlite://"),
+        async_database_read_urls=(replica.replace("sqlite://", "sqlite+aiosqlite://"),),
+        db_async=True,
+        read_your_writes_seconds=60,
+        metrics_enabled=False,
+        internal_endpoints=True,
+    )
+    previous = database.engine_settings()
+    try:
+        app = create_app(settings)
+        with TestClient(app) as writer, TestClient(app) as other:
+            # Routes async (GET) sur le réplica async
+            assert other.get("/users/1").json()["name"] == "Réplica"
+
+            # Écriture (route sync) puis relecture async: le cookie renvoie ce client sur le primaire
+            user_id = writer.post("/users/", json={"name": "Alice", "email": "alice@example.com"}).json()["id"]
+            assert [u["name"] for u in writer.get("/users/").json()] == ["Alice"]
+            assert writer.get(f"/users/{user_id}").json()["name"] == "Alice"
+            assert "Alice" not in {u["name"] for u in other.get("/users/").json()}
+
+            assert len(writer.get("/internal/pool").json()["async_readers"]) == 1
+    finally:
+        database.configure(previous)
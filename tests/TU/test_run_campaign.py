@@ -0,0 +1,91 @@
+from xml.etree import ElementTree as ET
+
+from tests import run_campaign
+from tests.run_campaign import (
+    BACKEND_DIR,
+    TESTS_DIR,
+    merge_junit,
+    merge_return_codes,
+    parse_junit,
+    plan_runs,
+    shard_files,
+)
+
+
+def write_report(path, suites):
+    path.mkdir(parents=True)
+    if len(suites) == 1:
+        root = suites[0]
+    else:
+        root = ET.Element("testsuites")
+        root.extend(suites)
+    ET.ElementTree(root).write(path / "report.xml", encoding="utf-8", xml_declaration=True)
+
+
+def suite(name, tests, failures=0, errors=0, skipped=0, time="1.5"):
+    element = ET.Element("testsuite", name=name, tests=str(tests), failures=str(failures),
+                         errors=str(errors), skipped=str(skipped), time=time)
+    for i in range(tests):
+        ET.SubElement(element, "testcase", classname=name, name=f"test_{i}")
+    return element
+
+
+def test_merge_junit_sums_shard_totals_and_keeps_testcases(tmp_path):
+    # Un lot en <testsuite>, un autre en <testsuites>, un lot sans rapport (crash)
+    write_report(tmp_path / "shard_0", [suite("a", 3, failures=1, time="2.0")])
+    write_report(tmp_path / "shard_1", [suite("b", 2, skipped=1, time="0.5"), suite("c", 4, errors=1, time="1.0")])
+    shard_dirs = [tmp_path / "shard_0", tmp_path / "shard_1", tmp_path / "shard_2"]
+
+    merged = tmp_path / "report.xml"
+    merge_junit(shard_dirs, merged)
+
+    assert parse_junit(merged) == {"tests": 9, "failures": 1, "errors": 1, "skipped": 1, "time": 3.5}
+    root = ET.parse(merged).getroot()
+    assert root.tag == "testsuites"
+    assert [s.attrib["name"] for s in root.findall("testsuite")] == ["a", "b", "c"]
+    assert len(root.findall("testsuite/testcase")) == 9
+
+
+def test_merge_return_codes_ignores_empty_shards():
+    assert merge_return_codes([0, 5, 0]) == 0
+    assert merge_return_codes([0, 1, 5]) == 1
+    assert merge_return_codes([5, 5]) == 5
+
+
+def test_shard_files_assigns_each_non_tv_file_once():
+    expected = sorted(
+        str(p.relative_to(BACKEND_DIR))
+        for p in TESTS_DIR.rglob("test_*.py")
+        if "TV" not in p.relative_to(TESTS_DIR).parts
+    )
+    for workers in (1, 2, 3, 8, 1000):
+        shards = shard_files(workers)
+        assigned = [f for shard in shards for f in shard]
+        assert sorted(assigned) == expected
+        assert len(shards) == min(workers, len(expected))
+        assert all(shards)
+    assert shard_files(3) == shard_files(3)
+
+
+def test_shard_files_balances_by_size():
+    shards = shard_files(2)
+    loads = [sum((BACKEND_DIR / f).stat().st_size for f in shard) for shard in shards]
+    largest = max((BACKEND_DIR / f).stat().st_size for shard in shards for f in shard)
+    # Répartition gloutonne: l'écart ne dépasse pas le plus gros fichier
+    assert max(loads) - min(loads) <= largest
+
+
+def test_plan_runs_keeps_mysql_runs_in_serial_lane():
+    lane, sharded = plan_runs()
+    assert [name for name, _, _ in lane] == ["all_no_cov", "all_cov", "tv_no_cov", "tv_cov"]
+    assert [name for name, _, _ in sharded] == ["tu_no_cov", "tu_cov"]
+    assert all(markers == "not tv" for _, markers, _ in sharded)
+
+
+def test_parallel_workers_is_bounded_by_cpu_count(monkeypatch):
+    monkeypatch.setattr(run_campaign.os, "cpu_count", lambda: 4)
+    assert run_campaign.parallel_workers(8) == 4
+    assert run_campaign.parallel_workers(2) == 2
+    assert run_campaign.parallel_workers(0) == 1
+    monkeypatch.setattr(run_campaign.os, "cpu_count", lambda: None)
+    assert run_campaign.parallel_workers(8) == 1
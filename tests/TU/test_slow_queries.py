@@ -0,0 +1,80 @@
+import logging
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app import slow_queries
+from tests.TU.conftest import engine
+
+
+@pytest.fixture()
+def slow_log(client, override_settings):
+    """Journal branché sur l'engine de test, seuil quasi nul: toute requête est « lente »"""
+    override_settings(slow_query_ms=1e-6)
+    slow_queries.install_slow_query_log(engine)
+    slow_queries.clear_slow_queries()
+    yield slow_queries
+    event.remove(engine, "before_cursor_execute", slow_queries._before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", slow_queries._after_cursor_execute)
+    slow_queries.clear_slow_queries()
+
+
+def test_slow_queries_logged_with_route_and_parameter_shapes(client, slow_log, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+        assert client.get("/stocks/", params={"user_id": 3}).status_code == 200
+
+    entries = [
+        q for q in slow_log.recent_slow_queries()
+        if q["route"] == "GET /stocks/" and q["sql"].startswith("SELECT")
+    ]
+    assert entries
+    listing = entries[-1]
+    assert listing["sql"].startswith("SELECT")
+    assert "stocks.user_id = ?" in listing["sql"]
+    # Valeurs jamais journalisées: seulement leurs types (user_id, limit...)
+    assert re.fullmatch(r"\(int\*\d\)", listing["parameters"])
+    assert listing["duration_ms"] >= 0
+    assert "plan" not in listing
+    assert any("GET /stocks/" in r.getMessage() for r in caplog.records)
+
+
+def test_slow_queries_capture_plan(client, slow_log, override_settings):
+    override_settings(slow_query_explain=True)
+    client.get("/stocks/", params={"user_id": 3, "item_id": 1})
+
+    plans = [q["plan"] for q in slow_log.recent_slow_queries() if q["route"] == "GET /stocks/"]
+    assert any("ix_stocks_user_item" in line for plan in plans if plan for line in plan)
+
+    r = client.get("/internal/slow-queries")
+    assert r.status_code == 200
+    assert r.json()["threshold_ms"] == 1e-6
+    assert r.json()["queries"]
+
+
+def test_parameter_shape_compacts_expanded_lists():
+    assert slow_queries.parameter_shape((1, 2, 3, "a")) == "(int*3, str)"
+    assert slow_queries.parameter_shape({"id": 1, "name": "x"}) == "{int, str}"
+    assert slow_queries.parameter_shape([(1, "a"), (2, "b")], executemany=True) == "2 x (int, str)"
+
+
+def test_slow_queries_have_route_without_metrics(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from app import database
+    from app.database import Base
+    from app.main import create_app
+    from app.settings import Settings
+
+    previous = database.engine_settings()
+    settings = Settings(database_url=f"sqlite:///{tmp_path / 'slow.db'}", metrics_enabled=False, slow_query_ms=1e-6)
+    try:
+        with TestClient(create_app(settings)) as client:
+            Base.metadata.create_all(bind=database.get_engine())
+            slow_queries.clear_slow_queries()
+            assert client.get("/users/").status_code == 200
+            routes = {q["route"] for q in slow_queries.recent_slow_queries() if q["sql"].startswith("SELECT")}
+            assert routes == {"GET /users/"}
+    finally:
+        database.configure(previous)
+        slow_queries.clear_slow_queries()
@@ -1,3 +1,6 @@
+import pytest
+
+
 def _create_item(client, name="Lait"):
     r = client.post("/items/", json={"name": name, "is_food": True, "unit": "L"})
     assert r.status_code == 200
@@ -67,3 +70,229 @@ def test_stock_create_with_unknown_item_returns_404(client):
         },
     )
     assert r.status_code == 404
+
+
+def test_stocks_export_csv_header_only_when_empty(client):
+    r = client.get("/stocks/export", params={"format": "csv"})
+    assert r.status_code == 200
+    assert r.text.splitlines() == [
+        "id,item_id,user_id,group_id,expiration_date,initial_quantity,"
+        "remaining_quantity,lot_count,created_at,updated_at"
+    ]
+
+
+def _stock_payload(item_id, **overrides):
+    payload = {
+        "item_id": item_id,
+        "user_id": None,
+        "group_id": None,
+        "expiration_date": None,
+        "initial_quantity": 1.0,
+        "remaining_quantity": 1.0,
+        "lot_count": 1,
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_stocks_list_filters(client):
+    lait = _create_item(client, "Lait")
+    oeufs = _create_item(client, "Oeufs")
+    uid = client.post("/users/", json={"name": "Zoe", "email": "zoe@example.com"}).json()["id"]
+    gid = client.post("/groups/", json={"name": "Maison"}).json()["id"]
+
+    s1 = client.post("/stocks/", json=_stock_payload(lait, user_id=uid, expiration_date="2030-01-10")).json()["id"]
+    s2 = client.post("/stocks/", json=_stock_payload(oeufs, user_id=uid, remaining_quantity=0.0)).json()["id"]
+    s3 = client.post("/stocks/", json=_stock_payload(lait, group_id=gid, expiration_date="2030-03-01")).json()["id"]
+
+    def ids(**params):
+        r = client.get("/stocks/", params=params)
+        assert r.status_code == 200
+        return [s["id"] for s in r.json()]
+
+    assert ids(user_id=uid) == [s1, s2]
+    assert ids(group_id=gid) == [s3]
+    assert ids(item_id=lait, user_id=uid) == [s1]
+    assert ids(expiring_before="2030-02-01") == [s1]
+    assert ids(min_remaining=0.5) == [s1, s3]
+    assert ids(item_id=oeufs, group_id=gid) == []
+
+
+def test_stock_indexes_declared_on_model():
+    from app import models
+
+    names = {ix.name for ix in models.Stock.__table__.indexes}
+    assert {"ix_stocks_user_item", "ix_stocks_group_item", "ix_stocks_item_expiration"} <= names
+
+
+def test_expiring_stocks_for_user_and_groups(client):
+    from datetime import date, timedelta
+
+    def in_days(n):
+        return (date.today() + timedelta(days=n)).isoformat()
+
+    item_id = _create_item(client)
+    uid = client.post("/users/", json={"name": "Léa", "email": "lea@example.com"}).json()["id"]
+    other = client.post("/users/", json={"name": "Max", "email": "max@example.com"}).json()["id"]
+    gid = client.post("/groups/", json={"name": "Coloc"}).json()["id"]
+    client.post("/groups/add_user", json={"user_id": uid, "group_id": gid, "role": "member"})
+
+    def create(**kw):
+        r = client.post("/stocks/", json=_stock_payload(item_id, **kw))
+        assert r.status_code == 200
+        return r.json()["id"]
+
+    mine_late = create(user_id=uid, expiration_date=in_days(5))
+    group_soon = create(group_id=gid, expiration_date=in_days(1))
+    create(user_id=uid, expiration_date=in_days(2), remaining_quantity=0.0)  # vide
+    create(user_id=uid, expiration_date=in_days(30))  # hors horizon
+    create(user_id=other, expiration_date=in_days(1))  # autre utilisateur
+    both = create(user_id=uid, group_id=gid, expiration_date=in_days(3))  # une seule fois
+
+    r = client.get("/stocks/expiring", params={"days": 7, "user_id": uid})
+    assert r.status_code == 200
+    assert [s["id"] for s in r.json()] == [group_soon, both, mine_late]
+
+    r_all = client.get("/stocks/expiring", params={"days": 1})
+    assert r_all.status_code == 200
+    assert len(r_all.json()) == 2
+
+
+def test_stocks_bulk_create(client, query_counter):
+    lait = _create_item(client, "Lait")
+    pates = _create_item(client, "Pâtes")
+    payload = [_stock_payload(lait if i % 2 else pates, initial_quantity=i + 1, remaining_quantity=i + 1) for i in range(40)]
+
+    query_counter.clear()
+    r = client.post("/stocks/bulk", json=payload)
+    assert r.status_code == 200
+    created = r.json()
+    assert len(created) == 40
+    assert [s["initial_quantity"] for s in created] == [float(i + 1) for i in range(40)]
+    assert all(s["created_at"] for s in created)
+    # Nombre de requêtes indépendant du nombre de lignes
+    assert len(query_counter) < 10
+
+    r_movs = client.get("/movements/", params={"limit": 500})
+    initial = [m for m in r_movs.json() if m["note"] == "Stock initial créé"]
+    assert sorted(m["stock_id"] for m in initial) == [s["id"] for s in created]
+
+
+def test_stocks_bulk_create_is_all_or_nothing(client):
+    lait = _create_item(client, "Lait")
+    r = client.post("/stocks/bulk", json=[_stock_payload(lait), _stock_payload(9999)])
+    assert r.status_code == 404
+    assert "9999" in r.json()["detail"]
+    assert client.get("/stocks/").json() == []
+
+    assert client.post("/stocks/bulk", json=[]).status_code == 422
+
+
+def test_stocks_bulk_create_without_returning_support(client, monkeypatch):
+    from app.routers import stocks as stocks_router
+
+    # Chemin MySQL (pas d'INSERT ... RETURNING multi-lignes)
+    monkeypatch.setattr(stocks_router, "_multirow_returning", lambda db: False)
+    lait = _create_item(client, "Lait")
+    r = client.post("/stocks/bulk", json=[_stock_payload(lait, initial_quantity=q, remaining_quantity=q) for q in (1, 2, 3)])
+    assert r.status_code == 200
+    assert [s["initial_quantity"] for s in r.json()] == [1.0, 2.0, 3.0]
+    assert len(client.get("/movements/").json()) == 3
+
+
+def test_stocks_batch_update_applies_all(client):
+    item_id = _create_item(client)
+    created = client.post(
+        "/stocks/bulk",
+        json=[_stock_payload(item_id, initial_quantity=q, remaining_quantity=q) for q in (5, 3)],
+    ).json()
+    s1, s2 = created[0]["id"], created[1]["id"]
+
+    r = client.put(
+        "/stocks/batch",
+        json=[
+            {"stock_id": s2, "change": -1, "note": "Gratin"},
+            {"stock_id": s1, "change": -2},
+            {"stock_id": s1, "change": -3},
+        ],
+    )
+    assert r.status_code == 200
+    assert [(s["id"], s["remaining_quantity"]) for s in r.json()] == [(s1, 0.0), (s2, 2.0)]
+
+    movs = client.get(f"/movements/stock/{s2}").json()
+    assert movs[-1]["note"] == "Gratin"
+    assert len(client.get(f"/movements/stock/{s1}").json()) == 3
+
+
+def test_stocks_batch_update_is_all_or_nothing(client):
+    item_id = _create_item(client)
+    sid = client.post("/stocks/", json=_stock_payload(item_id, initial_quantity=2, remaining_quantity=2)).json()["id"]
+
+    r = client.put(
+        "/stocks/batch",
+        json=[
+            {"stock_id": sid, "change": -1},
+            {"stock_id": sid, "change": -5},
+            {"stock_id": 9999, "change": 1},
+        ],
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == [
+        {"index": 1, "stock_id": sid, "detail": "Quantité insuffisante"},
+        {"index": 2, "stock_id": 9999, "detail": "Stock introuvable"},
+    ]
+    assert client.get(f"/stocks/{sid}").json()["remaining_quantity"] == 2.0
+    assert len(client.get(f"/movements/stock/{sid}").json()) == 1
+
+    r_nf = client.put("/stocks/batch", json=[{"stock_id": 9999, "change": 1}])
+    assert r_nf.status_code == 404
+
+
+@pytest.fixture()
+def file_client(tmp_path):
+    """Client sur une base SQLite fichier: chaque requête a sa propre connexion (vraie concurrence)."""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import Base, get_db
+    from app.main import create_app
+    from app.settings import Settings
+
+    url = f"sqlite:///{tmp_path / 'concurrency.db'}"
+    engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30}, pool_size=16)
+    Base.metadata.create_all(bind=engine)
+    SessionFile = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionFile()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Application propre au test: ni la configuration ni les overrides de l'environnement
+    app = create_app(Settings(database_url=url))
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        engine.dispose()
+
+
+def test_update_stock_quantity_has_no_lost_updates(file_client):
+    from concurrent.futures import ThreadPoolExecutor
+
+    item_id = _create_item(file_client)
+    sid = file_client.post(
+        "/stocks/", json=_stock_payload(item_id, initial_quantity=50, remaining_quantity=50)
+    ).json()["id"]
+
+    # 80 consommations concurrentes de 1 sur un stock de 50
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        codes = list(pool.map(lambda _: file_client.put(f"/stocks/{sid}", params={"change": -1}).status_code, range(80)))
+
+    assert codes.count(200) == 50
+    assert codes.count(400) == 30
+    assert file_client.get(f"/stocks/{sid}").json()["remaining_quantity"] == 0.0
+    assert len(file_client.get(f"/movements/stock/{sid}").json()) == 51
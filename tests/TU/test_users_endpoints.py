@@ -33,3 +33,71 @@ def test_users_crud_flow(client):
     r_get2 = client.get(f"/users/{user_id}")
     assert r_get2.status_code == 404
 
+
+
+def _seed_memberships(client, n_users, n_groups, prefix):
+    group_ids = []
+    for g in range(n_groups):
+        rg = client.post("/groups/", json={"name": f"Groupe {g}"})
+        assert rg.status_code == 200
+        group_ids.append(rg.json()["id"])
+    for u in range(n_users):
+        ru = client.post("/users/", json={"name": f"U{u}", "email": f"{prefix}{u}@example.com"})
+        assert ru.status_code == 200
+        for gid in group_ids:
+            rl = client.post(
+                "/groups/add_user",
+                json={"user_id": ru.json()["id"], "group_id": gid, "role": "member"},
+            )
+            assert rl.status_code == 200
+    return group_ids
+
+
+def test_users_listing_query_count_is_constant(client, query_counter):
+    group_ids = _seed_memberships(client, n_users=2, n_groups=1, prefix="a")
+    query_counter.clear()
+    r_small = client.get("/users/")
+    assert r_small.status_code == 200
+    small = len(query_counter)
+
+    _seed_memberships(client, n_users=6, n_groups=3, prefix="b")
+    query_counter.clear()
+    r_big = client.get("/users/")
+    assert r_big.status_code == 200
+    assert len(r_big.json()) == 8
+    assert all(u["groups"] for u in r_big.json())
+    assert len(query_counter) == small
+
+    # Même garantie pour les membres d'un groupe
+    query_counter.clear()
+    r_members = client.get(f"/groups/{group_ids[0]}/users")
+    assert r_members.status_code == 200
+    assert r_members.json()[0]["groups"][0]["group"]["id"] == group_ids[0]
+    assert len(query_counter) <= small + 1
+
+
+def test_users_bulk_delete_reports_per_id(client, query_counter):
+    free = [client.post("/users/", json={"name": f"Libre {i}", "email": f"libre{i}@example.com"}).json()["id"] for i in range(3)]
+    member = client.post("/users/", json={"name": "Membre", "email": "membre@example.com"}).json()["id"]
+    group_id = client.post("/groups/", json={"name": "Coloc"}).json()["id"]
+    client.post("/groups/add_user", json={"user_id": member, "group_id": group_id, "role": "member"})
+
+    # Une requête de vérification (EXISTS) et un DELETE, quel que soit le nombre d'IDs
+    query_counter.clear()
+    r = client.request("DELETE", "/users/bulk", json=[free[0], member, 999999, free[1], free[2], free[0]])
+    assert r.status_code == 200
+    assert len(query_counter) == 2
+
+    report = r.json()
+    assert [line["id"] for line in report] == [free[0], member, 999999, free[1], free[2]]
+    by_id = {line["id"]: line for line in report}
+    assert by_id[free[0]] == {"id": free[0], "status_code": 200, "detail": f"Utilisateur {free[0]} supprimé"}
+    assert by_id[member]["status_code"] == 409
+    assert by_id[member]["detail"] == client.delete(f"/users/{member}").json()["detail"]
+    assert by_id[999999] == {"id": 999999, "status_code": 404, "detail": "Utilisateur introuvable"}
+
+    remaining = {u["id"] for u in client.get("/users/").json()}
+    assert member in remaining and not remaining & set(free)
+
+    # Liste vide refusée
+    assert client.request("DELETE", "/users/bulk", json=[]).status_code == 422
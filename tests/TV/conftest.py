@@ -8,12 +8,8 @@ from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.database import Base
-from app.routers import users as users_router
-from app.routers import groups as groups_router
-from app.routers import items as items_router
-from app.routers import stocks as stocks_router
-from app.routers import stock_movements as movements_router
+from app.cache import clear_caches
+from app.database import Base, get_db
 
 
 def _read_sql_file(filepath: str) -> list[str]:
@@ -39,40 +35,60 @@ def _seed_database(connection):
         connection.execute(text(stmt))
 
 
-@pytest.fixture(scope="function")
-def tv_db():
-    """Connecte une base dédiée aux TV (test DB), jamais la base de prod.
+# Tables dont les tests attendent des IDs fixes (seed puis lignes créées par le test)
+_AUTO_INCREMENT_TABLES = ["users", "groups", "items", "stocks", "stock_movements"]
+
+
+def _reset_auto_increment(connection):
+    """Ramène AUTO_INCREMENT au plus petit possible (MySQL le remonte à max(id) + 1).
+
+    Un rollback ne rembobine pas AUTO_INCREMENT: sans ce reset, les IDs créés par un
+    test décalent ceux du suivant. ALTER TABLE valide implicitement la transaction
+    en cours: à exécuter hors de la transaction annulée du test.
+    """
+    for table in _AUTO_INCREMENT_TABLES:
+        connection.execute(text(f"ALTER TABLE {table} AUTO_INCREMENT = 1"))
+
+
+def _tv_database_url() -> str:
+    """URL de la base dédiée aux TV (test DB), jamais la base de prod.
 
     - Si TEST_DATABASE_URL est défini, l'utilise tel quel.
     - Sinon, construit une URL MySQL à partir des variables .env et crée
       la base `<DB_NAME>_test` (ou `fridgey_test` par défaut) si elle n'existe pas.
-    - Crée le schéma (tables) si absent.
-    - Isole chaque test par transaction + DELETE transactionnels.
     """
     test_url = os.getenv("TEST_DATABASE_URL")
-    if not test_url:
-        db_user = os.getenv("DB_USER", "root")
-        db_password = os.getenv("DB_PASSWORD", "")
-        db_host = os.getenv("DB_HOST", "localhost")
-        db_port = os.getenv("DB_PORT", "3306")
-        base_name = os.getenv("DB_NAME", "fridgey")
-        test_name = os.getenv("DB_NAME_TEST", f"{base_name}_test")
-
-        server_url = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}"
-        try:
-            admin_engine = create_engine(server_url)
-            with admin_engine.connect() as admin_conn:
-                admin_conn.execute(text(f"CREATE DATABASE IF NOT EXISTS `{test_name}` CHARACTER SET utf8mb4"))
-        except SQLAlchemyError as e:
-            pytest.skip(
-                "Impossible de créer/accéder à la base de test. "
-                "Définis TEST_DATABASE_URL ou accordes le droit CREATE DATABASE.\n"
-                f"Détail: {e}"
-            )
-        test_url = f"{server_url}/{test_name}"
-
-    # Create engine for test DB
-    test_engine = create_engine(test_url)
+    if test_url:
+        return test_url
+    db_user = os.getenv("DB_USER", "root")
+    db_password = os.getenv("DB_PASSWORD", "")
+    db_host = os.getenv("DB_HOST", "localhost")
+    db_port = os.getenv("DB_PORT", "3306")
+    base_name = os.getenv("DB_NAME", "fridgey")
+    test_name = os.getenv("DB_NAME_TEST", f"{base_name}_test")
+
+    server_url = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}"
+    try:
+        admin_engine = create_engine(server_url)
+        with admin_engine.connect() as admin_conn:
+            admin_conn.execute(text(f"CREATE DATABASE IF NOT EXISTS `{test_name}` CHARACTER SET utf8mb4"))
+    except SQLAlchemyError as e:
+        pytest.skip(
+            "Impossible de créer/accéder à la base de test. "
+            "Définis TEST_DATABASE_URL ou accordes le droit CREATE DATABASE.\n"
+            f"Détail: {e}"
+        )
+    return f"{server_url}/{test_name}"
+
+
+@pytest.fixture(scope="session")
+def tv_engine():
+    """Base de test prête pour toute la session: schéma, nettoyage et seed une seule fois.
+
+    Le seed est validé (base dédiée); chaque test travaille ensuite dans une
+    transaction annulée au teardown (voir `tv_db`), qui le laisse intact.
+    """
+    test_engine = create_engine(_tv_database_url())
 
     # Ensure schema is present
     try:
@@ -80,66 +96,79 @@ def tv_db():
     except SQLAlchemyError as e:
         pytest.skip(f"Impossible de créer les tables sur la base de test: {e}")
 
-    # Open connection + begin transaction for isolation
     try:
-        connection = test_engine.connect()
-        trans = connection.begin()
+        with test_engine.begin() as connection:
+            connection.execute(text("SET FOREIGN_KEY_CHECKS=0"))
+            # Delete in FK-safe order
+            connection.execute(text("DELETE FROM stock_movements"))
+            connection.execute(text("DELETE FROM stock_movements_archive"))
+            connection.execute(text("DELETE FROM stock_balance_checkpoints"))
+            connection.execute(text("DELETE FROM stocks"))
+            connection.execute(text("DELETE FROM user_groups"))
+            connection.execute(text("DELETE FROM items"))
+            connection.execute(text("DELETE FROM users"))
+            connection.execute(text("DELETE FROM groups"))
+            # Reset AUTO_INCREMENT (IDs du seed attendus par les tests)
+            _reset_auto_increment(connection)
+            connection.execute(text("SET FOREIGN_KEY_CHECKS=1"))
+            _seed_database(connection)
     except SQLAlchemyError as e:
-        pytest.skip(f"Base de test indisponible: {e}")
+        pytest.skip(f"Impossible de nettoyer/initialiser la base de test pour les TV: {e}")
+
+    yield test_engine
+    test_engine.dispose()
+
 
-    # Clean tables inside the transaction (safe, rolled back at teardown)
+@pytest.fixture(scope="function")
+def tv_db(tv_engine):
+    """Connexion isolée par test: transaction externe annulée au teardown.
+
+    AUTO_INCREMENT est remis à max(id) + 1 avant d'ouvrir la transaction (hors de
+    celle-ci): chaque test voit les mêmes IDs, quel que soit l'ordre d'exécution.
+    """
     try:
-        connection.execute(text("SET FOREIGN_KEY_CHECKS=0"))
-        # Delete in FK-safe order
-        connection.execute(text("DELETE FROM stock_movements"))
-        connection.execute(text("DELETE FROM stocks"))
-        connection.execute(text("DELETE FROM user_groups"))
-        connection.execute(text("DELETE FROM items"))
-        connection.execute(text("DELETE FROM users"))
-        connection.execute(text("DELETE FROM groups"))
-        # Reset AUTO_INCREMENT within this transaction
-        for table in ["users", "groups", "items", "stocks", "stock_movements"]:
-            connection.execute(text(f"ALTER TABLE {table} AUTO_INCREMENT = 1"))
-        connection.execute(text("SET FOREIGN_KEY_CHECKS=1"))
-    except SQLAlchemyError:
-        trans.rollback()
-        connection.close()
-        pytest.skip("Impossible de nettoyer/initialiser la base de test pour les TV.")
-
-    # Seed with test data (transactional)
-    _seed_database(connection)
+        connection = tv_engine.connect()
+        _reset_auto_increment(connection)
+        connection.commit()
+        trans = connection.begin()
+    except SQLAlchemyError as e:
+        pytest.skip(f"Base de test indisponible: {e}")
 
     yield connection
 
-    # Rollback seed + test writes
+    # Rollback test writes (le seed de session reste intact)
     trans.rollback()
     connection.close()
 
 
 @pytest.fixture(scope="function")
 def client(tv_db):
-    # Bind a sessionmaker to the transaction connection
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=tv_db)
-    db = TestingSessionLocal()
+    # Une session par requête, comme en production, liée à la transaction du
+    # test: leurs commit() ne libèrent qu'un SAVEPOINT
+    TestingSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=tv_db,
+        join_transaction_mode="create_savepoint",
+    )
 
     def override_get_db():
-        # Yield the same session across requests (managed by outer transaction)
+        db = TestingSessionLocal()
         try:
             yield db
         finally:
-            # Don't close here, we close once per test in teardown
-            pass
+            db.close()
 
-    # Override dependencies
-    app.dependency_overrides[users_router.get_db] = override_get_db
-    app.dependency_overrides[groups_router.get_db] = override_get_db
-    app.dependency_overrides[items_router.get_db] = override_get_db
-    app.dependency_overrides[stocks_router.get_db] = override_get_db
-    app.dependency_overrides[movements_router.get_db] = override_get_db
+    # Override dependency (restauré au teardown: les TU surchargent aussi get_db)
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    clear_caches()
 
     with TestClient(app) as c:
         yield c
 
     # Teardown
-    db.close()
-    app.dependency_overrides.clear()
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
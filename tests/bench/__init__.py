@@ -0,0 +1 @@
+"""Banc de performance des endpoints sur jeux de données synthétiques (hors pytest)."""
@@ -0,0 +1,184 @@
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from tests.bench.scenarios import SCENARIOS
+from tests.bench.seed import DEFAULT_VOLUMES, bench_engine, seed
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Percentile par rang le plus proche (valeurs déjà triées)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, errors: int, wall_time: float) -> dict:
+    """Débit et latences (ms) d'un scénario"""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / wall_time, 2) if wall_time > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, timeout: float = 30.0):
+    """Lance l'API dans un sous-processus (le client ne lui prend pas le GIL)"""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "tests.bench.server", "--database-url", database_url, "--port", str(port)],
+        cwd=BACKEND_DIR,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Le serveur du banc s'est arrêté (code {proc.returncode})")
+        try:
+            httpx.get(f"{base_url}/items/", params={"limit": 1}, timeout=1.0)
+            return proc, base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("Le serveur du banc n'a pas démarré à temps")
+
+
+def run_scenario(client: httpx.Client, method: str, requests, concurrency: int, warmup: int = 0) -> dict:
+    """Joue les requêtes d'un scénario avec `concurrency` requêtes simultanées.
+
+    Les `warmup` premières requêtes (connexions, caches, plans) ne sont pas mesurées.
+    """
+
+    def one(request):
+        path, kwargs = request
+        start = time.perf_counter()
+        try:
+            status = client.request(method, path, **kwargs).status_code
+        except httpx.HTTPError:
+            status = None
+        return time.perf_counter() - start, status
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, requests[:warmup]))
+        wall_start = time.perf_counter()
+        results = list(pool.map(one, requests[warmup:]))
+        wall_time = time.perf_counter() - wall_start
+
+    errors = sum(1 for _, status in results if status is None or status >= 400)
+    return summarize([latency for latency, _ in results], errors, wall_time)
+
+
+def run_bench(
+    database_url=None,
+    volumes=None,
+    requests_per_endpoint: int = 200,
+    concurrency: int = 8,
+    seed_value: int = 42,
+    only=None,
+) -> dict:
+    """Amorce la base, démarre le serveur et mesure chaque scénario; renvoie le rapport"""
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    tmp_dir = None
+    if database_url is None:
+        tmp_dir = tempfile.TemporaryDirectory(prefix="fridgey-bench-")
+        database_url = f"sqlite:///{Path(tmp_dir.name) / 'bench.db'}"
+
+    engine = bench_engine(database_url)
+    try:
+        seed_start = time.perf_counter()
+        dataset = seed(engine, volumes, seed_value)
+        seed_time = time.perf_counter() - seed_start
+        dialect = engine.dialect.name
+    finally:
+        engine.dispose()
+
+    proc, base_url = start_server(database_url)
+    endpoints = {}
+    # Un client partagé (thread-safe), une connexion keep-alive par requête simultanée
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    warmup = concurrency * 2
+    try:
+        with httpx.Client(base_url=base_url, timeout=60.0, limits=limits) as client:
+            for name, method, build in SCENARIOS:
+                if only and not any(fragment in name for fragment in only):
+                    continue
+                rng = random.Random(f"{seed_value}:{name}")
+                requests = [build(rng, dataset) for _ in range(warmup + requests_per_endpoint)]
+                endpoints[name] = run_scenario(client, method, requests, concurrency, warmup)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "database": dialect,
+        "dataset": dataset,
+        "seed_time_s": round(seed_time, 3),
+        "requests_per_endpoint": requests_per_endpoint,
+        "concurrency": concurrency,
+        "endpoints": endpoints,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Banc de performance des endpoints (rapport JSON)")
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL"),
+        help="Base dédiée au banc (recréée!). Défaut: SQLite fichier temporaire",
+    )
+    for key, value in DEFAULT_VOLUMES.items():
+        parser.add_argument(f"--{key}", type=int, default=value, help=f"Volume de {key} (défaut {value})")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients HTTP simultanés")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", action="append", help="Ne jouer que les scénarios contenant ce texte (répétable)")
+    parser.add_argument("--output", type=Path, help="Fichier JSON du rapport (défaut: sortie standard)")
+    args = parser.parse_args(argv)
+
+    report = run_bench(
+        database_url=args.database_url,
+        volumes={key: getattr(args, key) for key in DEFAULT_VOLUMES},
+        requests_per_endpoint=args.requests,
+        concurrency=args.concurrency,
+        seed_value=args.seed,
+        only=args.only,
+    )
+    content = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(content + "\n", encoding="utf-8")
+    else:
+        print(content)
+    errors = sum(endpoint["errors"] for endpoint in report["endpoints"].values())
+    return 1 if errors else 0
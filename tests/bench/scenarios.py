@@ -0,0 +1,36 @@
+# Scénarios du banc: (nom, méthode, générateur de (chemin, arguments httpx)).
+# Les générateurs tirent des IDs dans les plages du jeu de données (`dataset`
+# renvoyé par seed.seed), avec un Random seedé: une campagne est rejouable.
+# Exports et suppressions exclus: ils lisent toute une table ou vident le jeu.
+
+
+def _pick(rng, dataset, key):
+    return rng.randint(1, dataset[key])
+
+
+SCENARIOS = [
+    # Users
+    ("GET /users/", "GET", lambda rng, d: ("/users/", {"params": {"limit": 100}})),
+    ("GET /users/{user_id}", "GET", lambda rng, d: (f"/users/{_pick(rng, d, 'users')}", {})),
+    # Groups
+    ("GET /groups/", "GET", lambda rng, d: ("/groups/", {"params": {"limit": 100}})),
+    ("GET /groups/{group_id}", "GET", lambda rng, d: (f"/groups/{_pick(rng, d, 'groups')}", {})),
+    ("GET /groups/{group_id}/users", "GET", lambda rng, d: (f"/groups/{_pick(rng, d, 'groups')}/users", {})),
+    ("GET /groups/{group_id}/inventory", "GET", lambda rng, d: (f"/groups/{_pick(rng, d, 'groups')}/inventory", {})),
+    # Items
+    ("GET /items/", "GET", lambda rng, d: ("/items/", {"params": {"limit": 100}})),
+    ("GET /items/{item_id}", "GET", lambda rng, d: (f"/items/{_pick(rng, d, 'items')}", {})),
+    ("POST /items/", "POST", lambda rng, d: ("/items/", {"json": {"name": f"Bench {rng.random():.6f}", "is_food": True, "unit": "u"}})),
+    # Stocks
+    ("GET /stocks/?user_id", "GET", lambda rng, d: ("/stocks/", {"params": {"user_id": _pick(rng, d, "users")}})),
+    ("GET /stocks/?group_id", "GET", lambda rng, d: ("/stocks/", {"params": {"group_id": _pick(rng, d, "groups")}})),
+    ("GET /stocks/?limit=500", "GET", lambda rng, d: ("/stocks/", {"params": {"limit": 500}})),
+    ("GET /stocks/expiring", "GET", lambda rng, d: ("/stocks/expiring", {"params": {"days": 14, "user_id": _pick(rng, d, "users")}})),
+    ("GET /stocks/{stock_id}", "GET", lambda rng, d: (f"/stocks/{_pick(rng, d, 'stocks')}", {})),
+    ("GET /stocks/{stock_id}/balance", "GET", lambda rng, d: (f"/stocks/{_pick(rng, d, 'stocks')}/balance", {})),
+    ("PUT /stocks/{stock_id}", "PUT", lambda rng, d: (f"/stocks/{_pick(rng, d, 'stocks')}", {"params": {"change": 1}})),
+    # Movements
+    ("GET /movements/", "GET", lambda rng, d: ("/movements/", {"params": {"limit": 100}})),
+    ("GET /movements/stock/{stock_id}", "GET", lambda rng, d: (f"/movements/stock/{_pick(rng, d, 'stocks')}", {})),
+    ("GET /movements/{movement_id}", "GET", lambda rng, d: (f"/movements/{_pick(rng, d, 'movements')}", {})),
+]
@@ -0,0 +1,129 @@
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.balances import maintain_checkpoints
+from app.database import Base
+
+# Volumes par défaut (surchargés en ligne de commande)
+DEFAULT_VOLUMES = {
+    "users": 200,
+    "groups": 50,
+    "items": 500,
+    "stocks": 5000,
+    "movements": 20000,
+}
+
+INSERT_CHUNK = 5000
+
+
+def bench_engine(database_url: str):
+    """Engine du banc: SQLite fichier en WAL (lectures concurrentes), ou l'URL fournie"""
+    if not database_url.startswith("sqlite"):
+        return create_engine(database_url, pool_size=20, max_overflow=20)
+    engine = create_engine(database_url, connect_args={"check_same_thread": False, "timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA foreign_keys=ON")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def _insert(conn, model, rows):
+    for start in range(0, len(rows), INSERT_CHUNK):
+        conn.execute(insert(model), rows[start:start + INSERT_CHUNK])
+
+
+def seed(engine, volumes: dict, seed_value: int = 42) -> dict:
+    """Recrée le schéma et insère des données cohérentes et reproductibles.
+
+    IDs séquentiels à partir de 1 (les scénarios tirent dans ces plages). Les
+    mouvements sont datés sur l'année écoulée, dans l'ordre des IDs, et les
+    checkpoints de solde sont posés comme après des écritures réelles.
+    """
+    rng = random.Random(seed_value)
+    n_users, n_groups, n_items = volumes["users"], volumes["groups"], volumes["items"]
+    n_stocks = volumes["stocks"]
+    n_movements = max(volumes["movements"], n_stocks)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    users = [{"name": f"User {i}", "email": f"bench.user{i}@example.com"} for i in range(1, n_users + 1)]
+    groups = [{"name": f"Groupe {i}"} for i in range(1, n_groups + 1)]
+    items = [
+        {"name": f"Produit {i}", "is_food": i % 5 != 0, "unit": rng.choice(["u", "g", "kg", "L"])}
+        for i in range(1, n_items + 1)
+    ]
+    links = set()
+    for user_id in range(1, n_users + 1):
+        for group_id in rng.sample(range(1, n_groups + 1), k=min(n_groups, rng.randint(1, 3))):
+            links.add((user_id, group_id))
+    user_groups = [
+        {"user_id": u, "group_id": g, "role": "admin" if rng.random() < 0.2 else "member"}
+        for u, g in sorted(links)
+    ]
+
+    # Un mouvement initial par stock, puis des consommations réparties au hasard
+    today = date.today()
+    remaining = [Decimal(rng.randint(10, 100)) for _ in range(n_stocks)]
+    initial = list(remaining)
+    extra_targets = [rng.randrange(n_stocks) for _ in range(n_movements - n_stocks)]
+    start = datetime.now() - timedelta(days=365)
+    step = timedelta(days=365) / n_movements
+    movements = [
+        {"stock_id": i + 1, "change_quantity": initial[i], "note": "Stock initial créé", "created_at": start + step * i}
+        for i in range(n_stocks)
+    ]
+    for offset, index in enumerate(extra_targets, start=n_stocks):
+        change = Decimal("-0.5") if remaining[index] >= 1 else Decimal("5")
+        remaining[index] += change
+        movements.append(
+            {"stock_id": index + 1, "change_quantity": change, "note": None, "created_at": start + step * offset}
+        )
+
+    stocks = []
+    for i in range(n_stocks):
+        owned_by_group = rng.random() < 0.5
+        stocks.append({
+            "item_id": rng.randint(1, n_items),
+            "user_id": None if owned_by_group else rng.randint(1, n_users),
+            "group_id": rng.randint(1, n_groups) if owned_by_group else None,
+            "expiration_date": today + timedelta(days=rng.randint(-60, 120)),
+            "initial_quantity": initial[i],
+            "remaining_quantity": remaining[i],
+            "lot_count": 1,
+        })
+
+    with engine.begin() as conn:
+        _insert(conn, models.User, users)
+        _insert(conn, models.Group, groups)
+        _insert(conn, models.UserGroup, user_groups)
+        _insert(conn, models.Item, items)
+        _insert(conn, models.Stock, stocks)
+        _insert(conn, models.StockMovement, movements)
+
+    with sessionmaker(bind=engine)() as db:
+        for chunk in range(1, n_stocks + 1, 500):
+            maintain_checkpoints(db, range(chunk, min(chunk + 500, n_stocks + 1)))
+        db.commit()
+
+    return {
+        "users": n_users,
+        "groups": n_groups,
+        "user_groups": len(user_groups),
+        "items": n_items,
+        "stocks": n_stocks,
+        "movements": len(movements),
+    }
@@ -0,0 +1,45 @@
+import argparse
+
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy.orm import sessionmaker
+
+from app.database import get_db
+from app.main import create_app
+from app.settings import Settings
+from tests.bench.seed import bench_engine
+
+
+def build_app(database_url: str) -> FastAPI:
+    """Application du banc, construite sur sa base: rien n'est lu depuis DATABASE_URL.
+
+    Les réplicas et le mode DB_ASYNC de l'environnement sont écartés: toutes les
+    requêtes passent par la session du banc (`bench_engine`, voir seed.py).
+    """
+    settings = Settings(database_url=database_url, database_read_urls=(), db_async=False)
+    app = create_app(settings)
+    BenchSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=bench_engine(database_url))
+
+    def bench_get_db():
+        db = BenchSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = bench_get_db
+    return app
+
+
+def main(argv=None) -> None:
+    """Sert l'application sur la base du banc (processus séparé du client de charge)"""
+    parser = argparse.ArgumentParser(description="Serveur du banc de performance")
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args(argv)
+
+    uvicorn.run(build_app(args.database_url), host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Exécuté dans un interpréteur neuf: `app.main:app` comme uvicorn (import et construction
+# de l'application), puis démarrage du worker (lifespan: engine et session factory).
+# Ne dépend pas de create_app: comparaison avant/après via --root sur un `git worktree`.
+_WORKER_PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app.main as main
+application = main.app
+imported = time.perf_counter()
+pymysql_at_import = "pymysql" in sys.modules
+
+async def boot():
+    async with application.router.lifespan_context(application):
+        pass
+
+asyncio.run(boot())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "startup_s": ready - start,
+    "pymysql_at_import": pymysql_at_import,
+}))
+"""
+
+
+def probe_worker(root: Path) -> dict:
+    """Un démarrage de worker à froid: durées internes et durée totale du processus"""
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _WORKER_PROBE], cwd=root, check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - start
+    return result
+
+
+def probe_collection(root: Path) -> float:
+    """Durée de `pytest --collect-only` sur les TU (import de l'application par conftest)"""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", "tests/TU"],
+        cwd=root,
+        check=True,
+        capture_output=True,
+    )
+    return time.perf_counter() - start
+
+
+def _stats(values) -> dict:
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "min_ms": round(min(values) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1),
+    }
+
+
+def run_startup_bench(root: Path = BACKEND_DIR, runs: int = 10, collect_runs: int = 3) -> dict:
+    workers = [probe_worker(root) for _ in range(runs)]
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "root": str(root),
+        "runs": runs,
+        "import": _stats([w["import_s"] for w in workers]),
+        "worker_startup": _stats([w["startup_s"] for w in workers]),
+        "process": _stats([w["process_s"] for w in workers]),
+        "pymysql_loaded_at_import": workers[0]["pymysql_at_import"],
+    }
+    if collect_runs:
+        report["tu_collection"] = _stats([probe_collection(root) for _ in range(collect_runs)])
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Temps de démarrage d'un worker et de collecte des TU (rapport JSON)")
+    parser.add_argument("--root", type=Path, default=BACKEND_DIR, help="Arbre à mesurer (ex: un git worktree de référence)")
+    parser.add_argument("--runs", type=int, default=10, help="Démarrages de worker mesurés")
+    parser.add_argument("--collect-runs", type=int, default=3, help="Collectes pytest mesurées (0 = aucune)")
+    parser.add_argument("--output", type=Path, help="Fichier JSON du rapport (défaut: sortie standard)")
+    args = parser.parse_args(argv)
+
+    report = run_startup_bench(args.root.resolve(), args.runs, args.collect_runs)
+    content = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(content + "\n", encoding="utf-8")
+    else:
+        print(content)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
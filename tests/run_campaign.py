@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
+import argparse
+import json
 import os
 import re
 import shlex
+import shutil
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from xml.etree import ElementTree as ET
@@ -157,49 +162,25 @@ def parse_coverage_details(xml_path: Path):
     }
 
 
-def pytest_run(name: str, markers: str | None, with_cov: bool):
-    out_dir = RESULTS_DIR / name
-    ensure_dir(out_dir)
-
-    junit_xml = out_dir / "report.xml"
-    cov_xml = out_dir / "coverage.xml"
-    cov_html = out_dir / "htmlcov"
-
-    base_cmd = [sys.executable, "-m", "pytest"]
-
-    # Select tests
+def select_args(markers: str | None):
+    """Sélection pytest d'un run (tous, TV seuls, ou tout sauf TV)"""
     if markers is None:
         # all tests
-        pass
-    elif markers == "tv":
-        base_cmd += ["-m", "tv", "tests/TV"]
-    elif markers == "not tv":
-        base_cmd += ["-m", "not tv", "tests"]
+        return []
+    if markers == "tv":
+        return ["-m", "tv", "tests/TV"]
+    if markers == "not tv":
+        return ["-m", "not tv", "tests"]
+    raise ValueError(f"Sélection inconnue: {markers}")
 
-    # Quiet output; always produce JUnit XML
-    cmd = base_cmd + ["-q", f"--junitxml={junit_xml}"]
 
-    if with_cov:
-        # Run from backend dir; target the Python package/module name
-        cmd += [
-            "--cov=app",
-            "--cov-report=term-missing",
-            f"--cov-report=xml:{cov_xml}",
-            f"--cov-report=html:{cov_html}",
-        ]
-
-    # Ensure coverage file is written inside the run folder when enabled
-    env = os.environ.copy()
-    if with_cov:
-        env["COVERAGE_FILE"] = str(out_dir / ".coverage")
-
-    # Run from backend directory so artifacts (.coverage) live under backend
-    rc, out = run(cmd, cwd=BACKEND_DIR, env=env)
+def finish_run(name: str, out_dir: Path, rc: int, out: str, with_cov: bool):
+    """Écrit stdout/return_code/summary d'un run et renvoie ses totaux"""
     write_text(out_dir / "stdout.txt", out)
     write_text(out_dir / "return_code.txt", str(rc))
 
-    junit = parse_junit(junit_xml)
-    cov = parse_coverage_xml(cov_xml) if with_cov else None
+    junit = parse_junit(out_dir / "report.xml")
+    cov = parse_coverage_xml(out_dir / "coverage.xml") if with_cov else None
 
     # Write a brief summary.json-like txt
     summary_lines = [
@@ -224,8 +205,206 @@ def pytest_run(name: str, markers: str | None, with_cov: bool):
     }
 
 
-def main():
+def pytest_run(name: str, markers: str | None, with_cov: bool, results_dir: Path | None = None):
+    out_dir = (results_dir or RESULTS_DIR) / name
+    ensure_dir(out_dir)
+
+    junit_xml = out_dir / "report.xml"
+    cov_xml = out_dir / "coverage.xml"
+    cov_html = out_dir / "htmlcov"
+
+    # Quiet output; always produce JUnit XML
+    cmd = [sys.executable, "-m", "pytest"] + select_args(markers) + ["-q", f"--junitxml={junit_xml}"]
+
+    if with_cov:
+        # Run from backend dir; target the Python package/module name
+        cmd += [
+            "--cov=app",
+            "--cov-report=term-missing",
+            f"--cov-report=xml:{cov_xml}",
+            f"--cov-report=html:{cov_html}",
+        ]
+
+    # Ensure coverage file is written inside the run folder when enabled
+    env = os.environ.copy()
+    if with_cov:
+        env["COVERAGE_FILE"] = str(out_dir / ".coverage")
+
+    # Run from backend directory so artifacts (.coverage) live under backend
+    rc, out = run(cmd, cwd=BACKEND_DIR, env=env)
+    return finish_run(name, out_dir, rc, out, with_cov)
+
+
+# -------- Mode parallèle --------
+
+# Runs de la campagne, dans l'ordre du mode série: (nom, sélection, couverture)
+RUNS = [
+    ("all_no_cov", None, False),
+    ("all_cov", None, True),
+    ("tu_no_cov", "not tv", False),
+    ("tu_cov", "not tv", True),
+    ("tv_no_cov", "tv", False),
+    ("tv_cov", "tv", True),
+]
+
+# Seuls les runs sans TV sont découpés: les TV partagent la base MySQL de test
+SHARDABLE = "not tv"
+
+
+def shard_files(workers: int):
+    """Répartit les fichiers de tests hors TV en lots équilibrés (par taille, déterministe)"""
+    files = sorted(
+        (p for p in TESTS_DIR.rglob("test_*.py") if "TV" not in p.relative_to(TESTS_DIR).parts),
+        key=lambda p: (-p.stat().st_size, str(p)),
+    )
+    shards = [[] for _ in range(max(1, min(workers, len(files))))]
+    loads = [0] * len(shards)
+    for path in files:
+        i = loads.index(min(loads))
+        shards[i].append(str(path.relative_to(BACKEND_DIR)))
+        loads[i] += path.stat().st_size
+    return [sorted(shard) for shard in shards]
+
+
+def pytest_shard(markers: str, files, shard_dir: str, with_cov: bool):
+    """Un lot de fichiers dans son propre processus pytest.
+
+    Chaque processus a sa base SQLite en mémoire (tests/TU/conftest.py) et son
+    propre `--basetemp` pour les bases fichier des tests (tmp_path).
+    """
+    shard_dir = Path(shard_dir)
+    ensure_dir(shard_dir)
+    cmd = [sys.executable, "-m", "pytest", "-m", markers, *files, "-q"]
+    cmd += [f"--junitxml={shard_dir / 'report.xml'}", f"--basetemp={shard_dir / 'tmp'}", "-p", "no:cacheprovider"]
+    env = os.environ.copy()
+    if with_cov:
+        cmd += ["--cov=app", "--cov-report="]
+        env["COVERAGE_FILE"] = str(shard_dir / ".coverage")
+    return run(cmd, cwd=BACKEND_DIR, env=env)
+
+
+def merge_junit(shard_dirs, junit_xml: Path):
+    """Réunit les <testsuite> des lots dans un seul rapport <testsuites>"""
+    merged = ET.Element("testsuites")
+    for shard_dir in shard_dirs:
+        path = Path(shard_dir) / "report.xml"
+        if not path.exists():
+            continue
+        root = ET.parse(path).getroot()
+        merged.extend([root] if root.tag == "testsuite" else list(root.findall("testsuite")))
+    ET.ElementTree(merged).write(junit_xml, encoding="utf-8", xml_declaration=True)
+
+
+def merge_return_codes(rcs):
+    """0 si tout passe; 5 (aucun test) seulement si aucun lot n'a collecté de test"""
+    collected = [rc for rc in rcs if rc != 5]
+    return max(collected) if collected else 5
+
+
+def merge_shards(name: str, with_cov: bool, shard_dirs, shard_results, results_dir: Path):
+    """Assemble les artefacts des lots comme ceux d'un run série (mêmes fichiers, mêmes totaux)"""
+    out_dir = results_dir / name
+    ensure_dir(out_dir)
+    merge_junit(shard_dirs, out_dir / "report.xml")
+
+    outputs = [f"== lot {i + 1}/{len(shard_dirs)} ==\n{out}" for i, (_, out) in enumerate(shard_results)]
+    if with_cov:
+        data_file = out_dir / ".coverage"
+        coverage = [sys.executable, "-m", "coverage"]
+        shard_data = [str(Path(d) / ".coverage") for d in shard_dirs if (Path(d) / ".coverage").exists()]
+        steps = [
+            coverage + ["combine", "--keep", f"--data-file={data_file}"] + shard_data,
+            coverage + ["report", "-m", f"--data-file={data_file}"],
+            coverage + ["xml", f"--data-file={data_file}", "-o", str(out_dir / "coverage.xml")],
+            coverage + ["html", f"--data-file={data_file}", "-d", str(out_dir / "htmlcov")],
+        ]
+        for step in steps:
+            _, out = run(step, cwd=BACKEND_DIR)
+            outputs.append(out)
+
+    rc = merge_return_codes([rc for rc, _ in shard_results])
+    return finish_run(name, out_dir, rc, "\n".join(outputs), with_cov)
+
+
+def run_lane(specs, results_dir: Path):
+    """Runs exécutés l'un après l'autre dans un même worker (ressource partagée)"""
+    return [pytest_run(name, markers, with_cov, results_dir) for name, markers, with_cov in specs]
+
+
+def plan_runs(runs=RUNS):
+    """Sépare les runs en (voie série, runs découpables), dans l'ordre de `runs`"""
+    lane = [spec for spec in runs if spec[1] != SHARDABLE]
+    sharded = [spec for spec in runs if spec[1] == SHARDABLE]
+    return lane, sharded
+
+
+def parallel_workers(requested: int):
+    """Borne -j au nombre de cœurs: au-delà, les lots se disputent le CPU et le mode série va plus vite"""
+    return max(1, min(requested, os.cpu_count() or 1))
+
+
+def run_parallel(workers: int, results_dir: Path):
+    """Planifie la campagne sur un pool de processus.
+
+    Les runs touchant la base MySQL de test (all_*, tv_*) restent en série dans
+    un seul worker; les runs hors TV sont découpés en lots par fichier, chacun
+    avec sa base SQLite, puis réassemblés. Les artefacts de `results/<horodatage>/`
+    et les totaux de SUMMARY.txt sont ceux du mode série.
+    """
+    shards = shard_files(workers)
+    shard_root = Path(tempfile.mkdtemp(prefix="campaign-shards-"))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            lane, to_shard = plan_runs()
+            lane_future = pool.submit(run_lane, lane, results_dir)
+            sharded = {}
+            for name, markers, with_cov in to_shard:
+                dirs = [str(shard_root / name / f"shard_{i}") for i in range(len(shards))]
+                futures = [pool.submit(pytest_shard, markers, files, d, with_cov) for files, d in zip(shards, dirs)]
+                sharded[name] = (with_cov, dirs, futures)
+
+            results = {r["name"]: r for r in lane_future.result()}
+            for name, (with_cov, dirs, futures) in sharded.items():
+                results[name] = merge_shards(name, with_cov, dirs, [f.result() for f in futures], results_dir)
+    finally:
+        shutil.rmtree(shard_root, ignore_errors=True)
+    return [results[name] for name, _, _ in RUNS]
+
+
+def bench_run(name: str, bench_args: str = ""):
+    """Étape banc de performance: rapport JSON + synthèse par endpoint"""
+    out_dir = RESULTS_DIR / name
+    ensure_dir(out_dir)
+    report_json = out_dir / "report.json"
+
+    cmd = [sys.executable, "-m", "tests.bench", f"--output={report_json}"] + shlex.split(bench_args)
+    rc, out = run(cmd, cwd=BACKEND_DIR)
+    write_text(out_dir / "stdout.txt", out)
+    write_text(out_dir / "return_code.txt", str(rc))
+
+    endpoints = {}
+    if report_json.exists():
+        endpoints = json.loads(report_json.read_text(encoding="utf-8")).get("endpoints", {})
+    summary_lines = [f"name: {name}", f"return_code: {rc}", f"endpoints: {len(endpoints)}"]
+    write_text(out_dir / "summary.txt", "\n".join(summary_lines) + "\n")
+
+    return {"name": name, "rc": rc, "endpoints": endpoints, "out_dir": str(out_dir)}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Campagne de tests (TU/TV, avec et sans couverture)")
+    parser.add_argument(
+        "-j", "--parallel", type=int, default=1, metavar="N",
+        help="Nombre de processus (1 = série), borné au nombre de cœurs. Les runs hors TV sont découpés en N lots",
+    )
+    parser.add_argument("--bench", action="store_true", help="Ajouter l'étape banc de performance (tests/bench)")
+    parser.add_argument("--bench-args", default="", help="Arguments passés à `python -m tests.bench` (volumes, concurrence...)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     global RESULTS_DIR
+    args = parse_args(argv)
     ensure_dir(RESULTS_DIR)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     run_root = RESULTS_DIR / timestamp
@@ -234,13 +413,11 @@ def main():
     # Temporarily set RESULTS_DIR to the timestamped folder
     RESULTS_DIR = run_root
 
-    runs = []
-    runs.append(pytest_run("all_no_cov", markers=None, with_cov=False))
-    runs.append(pytest_run("all_cov", markers=None, with_cov=True))
-    runs.append(pytest_run("tu_no_cov", markers="not tv", with_cov=False))
-    runs.append(pytest_run("tu_cov", markers="not tv", with_cov=True))
-    runs.append(pytest_run("tv_no_cov", markers="tv", with_cov=False))
-    runs.append(pytest_run("tv_cov", markers="tv", with_cov=True))
+    workers = parallel_workers(args.parallel)
+    if workers > 1:
+        runs = run_parallel(workers, run_root)
+    else:
+        runs = [pytest_run(name, markers, with_cov) for name, markers, with_cov in RUNS]
 
     # Global syntheses
     synth = []
@@ -287,6 +464,16 @@ def main():
         synth.append("")
         synth.append(f"(Info) Détails couverture indisponibles: {e}")
 
+    if args.bench:
+        bench = bench_run("bench", args.bench_args)
+        synth.append("")
+        synth.append("== Banc de performance (bench) ==")
+        synth.append(f"rc={bench['rc']} endpoints={len(bench['endpoints'])} rapport={Path(bench['out_dir']) / 'report.json'}")
+        for endpoint, stats in bench["endpoints"].items():
+            synth.append(
+                f"- {endpoint}: {stats['throughput_rps']} req/s p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms err={stats['errors']}"
+            )
+
     write_text(run_root / "SUMMARY.txt", "\n".join(synth) + "\n")
 
     print(f"Campagne terminée. Résultats dans: {run_root}")